@@ -1,5 +1,12 @@
 """API layer for FastAPI endpoints."""
 
-from .routes import router
+__all__ = ["router"]
 
-__all__ = ["router"]
\ No newline at end of file
+
+def __getattr__(name):
+    # Resolved lazily so importing app.api.health does not build the Strava routes
+    if name == "router":
+        from .routes import router
+
+        return router
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
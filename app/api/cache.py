@@ -0,0 +1,111 @@
+"""In-process response cache for read-mostly API endpoints."""
+
+import functools
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+import orjson
+from fastapi import HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.services.strava_service import StravaAPIError
+
+# Seconds a cached response is served before Strava is queried again.
+TTL_POLICIES: Dict[str, float] = {
+    "short": 5.0,
+    "normal": 20.0,
+    "long": 60.0,
+}
+
+
+@dataclass
+class CacheEntry:
+    """Encoded JSON response body with its freshness window."""
+    value: bytes
+    generated_at: float
+    stale_at: float
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.monotonic() < self.stale_at
+
+
+class ResponseCache:
+    """Bounded key/value store that keeps expired entries for stale fallbacks."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, CacheEntry] = {}
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        return self._entries.get(key)
+
+    def set(self, key: Hashable, value: bytes, ttl: float) -> None:
+        now = time.monotonic()
+        self._entries.pop(key, None)
+        self._entries[key] = CacheEntry(value=value, generated_at=now, stale_at=now + ttl)
+        while len(self._entries) > self.max_entries:
+            # Dicts keep insertion order, so the first key is the oldest write.
+            self._entries.pop(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# Each container serves a single athlete token, so keys do not need an athlete id.
+response_cache = ResponseCache()
+
+
+def _key_part(value: Any) -> Hashable:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _cached_response(entry: CacheEntry, state: str) -> Response:
+    return Response(
+        content=entry.value, media_type="application/json", headers={"X-Cache": state}
+    )
+
+
+def cached(
+    ttl_policy: str = "normal", cache: ResponseCache = response_cache
+) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """Cache an endpoint's encoded JSON body keyed by its query parameters.
+
+    The wrapped handler lets ``StravaAPIError`` propagate: when an older payload
+    exists it is returned with ``X-Cache: stale``, otherwise the error becomes
+    an HTTP 400 like the uncached endpoints.
+    """
+    ttl = TTL_POLICIES[ttl_policy]
+
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        @functools.wraps(func)
+        async def wrapper(**kwargs: Any) -> Any:
+            key = (
+                func.__qualname__,
+                tuple(sorted((name, _key_part(value)) for name, value in kwargs.items())),
+            )
+            entry = cache.get(key)
+            if entry is not None and entry.is_fresh:
+                return _cached_response(entry, "hit")
+
+            try:
+                result = await func(**kwargs)
+            except StravaAPIError as e:
+                if entry is not None:
+                    return _cached_response(entry, "stale")
+                raise HTTPException(status_code=400, detail=str(e))
+
+            if isinstance(result, Response):
+                body = result.body
+            else:
+                body = orjson.dumps(jsonable_encoder(result))
+            cache.set(key, body, ttl)
+            return result
+
+        return wrapper
+
+    return decorator
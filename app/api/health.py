@@ -0,0 +1,27 @@
+"""Health check endpoints, kept free of the Strava and bot services."""
+
+from fastapi import APIRouter
+
+from app import __version__
+
+# Served at the application root
+router = APIRouter()
+
+# Served under the versioned API prefix
+api_router = APIRouter()
+
+
+@router.get("/health")
+async def health_check():
+    """Health check endpoint."""
+    return {
+        "status": "healthy",
+        "app": "Strava NoShoes",
+        "version": __version__
+    }
+
+
+@api_router.get("/", summary="Health check")
+async def api_health_check():
+    """Health check endpoint."""
+    return {"status": "ok", "message": "Strava NoShoes API is running (Strava API)"}
@@ -1,31 +1,71 @@
+import asyncio
+import base64
 import os
-from datetime import datetime
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Query, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Query, BackgroundTasks, Request, Response
 from fastapi.responses import FileResponse
-from app.models.strava import Activity, Athlete, Gear, ActivityFilter, PaginatedResponse
+from pydantic import BaseModel
+from app.api.cache import cached
+from app.api.responses import ORJSONResponse
+from app.models.strava import (
+    Activity,
+    ActivityFilter,
+    ActivitySummary,
+    Athlete,
+    Gear,
+    PaginatedResponse,
+)
 from app.services.strava_service import StravaAPIError, StravaService
+from app.utils.singleflight import run_once
 
 router = APIRouter()
 service = StravaService()
 
+# Lookback windows for the stats ``range`` shortcuts; "all" clears both bounds.
+_RANGE_TABLE = {
+    "1w": timedelta(weeks=1),
+    "1m": timedelta(days=30),
+    "3m": timedelta(days=90),
+    "1y": timedelta(days=365),
+}
 
-@router.get("/", summary="Health check")
-async def health_check():
-    """Health check endpoint."""
-    return {"status": "ok", "message": "Strava NoShoes API is running (Strava API)"}
+
+def encode_cursor(start_date: datetime) -> str:
+    """Encode an activity start time as an opaque pagination cursor."""
+    return base64.urlsafe_b64encode(str(int(start_date.timestamp())).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Optional[datetime]:
+    """Decode a cursor into the exclusive ``before`` bound of the next page.
+
+    An empty cursor starts cursor pagination from the newest activity.
+    Raises ValueError for malformed cursors.
+    """
+    if not cursor:
+        return None
+    epoch = int(base64.urlsafe_b64decode(cursor.encode()))
+    try:
+        return datetime.fromtimestamp(epoch, tz=timezone.utc)
+    except (OverflowError, OSError) as e:
+        raise ValueError(f"cursor epoch out of range: {epoch}") from e
 
 
 @router.get("/athlete", response_model=Athlete, summary="Get connected Strava athlete")
+@cached(ttl_policy="long")
 async def get_connected_athlete():
     """Return the athlete identity associated with this container's OAuth token."""
-    try:
-        return await service.get_athlete()
-    except StravaAPIError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    return await service.get_athlete()
 
 
-@router.get("/activities", response_model=PaginatedResponse, summary="Get athlete activities")
+@router.get(
+    "/activities",
+    response_class=ORJSONResponse,
+    responses={200: {"model": PaginatedResponse}},
+    summary="Get athlete activities",
+)
+@cached(ttl_policy="short")
 async def get_activities(
     before: Optional[datetime] = Query(None, description="Activities before this date"),
     after: Optional[datetime] = Query(None, description="Activities after this date"),
@@ -33,61 +73,132 @@ async def get_activities(
     per_page: int = Query(30, ge=1, le=200, description="Activities per page"),
     activity_type: Optional[str] = Query(None, description="Filter by activity type (Run, Ride, etc.)"),
     has_gear: Optional[bool] = Query(None, description="Filter activities with/without gear"),
-    gear_id: Optional[str] = Query(None, description="Filter by specific gear ID")
+    gear_id: Optional[str] = Query(None, description="Filter by specific gear ID"),
+    cursor: Optional[str] = Query(
+        None,
+        description="Cursor from a previous next_cursor; an empty value starts cursor pagination",
+    ),
 ):
-    """Get athlete's activities with optional filtering."""
-    try:
-        activity_filter = ActivityFilter(
-            before=before,
-            after=after,
-            page=page,
-            per_page=per_page,
-            activity_type=activity_type,
-            has_gear=has_gear,
-            gear_id=gear_id
-        )
-
-        fetched_activities = await service.get_activities(activity_filter, all_pages=True)
-
-        total = len(fetched_activities)
-        total_pages = (total + per_page - 1) // per_page
-
-        # Apply pagination in memory
-        start_idx = (page - 1) * per_page
-        end_idx = start_idx + per_page
-        paginated_items = fetched_activities[start_idx:end_idx]
-
-        return {
-            "items": paginated_items,
-            "total": total,
-            "page": page,
-            "per_page": per_page,
-            "total_pages": total_pages
-        }
-    except StravaAPIError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-
-
-@router.get("/activities/no-gear", response_model=List[Activity], summary="Get activities without gear")
+    """Get athlete's activities with optional filtering.
+
+    Without ``cursor`` the full matching history is fetched and sliced by
+    ``page``, unless no client-side filter or ``after`` bound is set, in which
+    case ``page`` is passed straight to Strava. With ``cursor`` only the next
+    ``per_page`` items are fetched. Both single-page modes omit
+    ``total``/``total_pages``.
+    """
+    if cursor is not None:
+        try:
+            cursor_before = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if cursor_before and (before is None or cursor_before.timestamp() < before.timestamp()):
+            before = cursor_before
+
+    activity_filter = ActivityFilter(
+        before=before,
+        after=after,
+        page=page,
+        per_page=per_page,
+        activity_type=activity_type,
+        has_gear=has_gear,
+        gear_id=gear_id
+    )
+
+    if cursor is not None:
+        items = await service.get_activities_before(activity_filter, limit=per_page)
+        return _page_response(items, page, per_page, has_more=len(items) == per_page)
+
+    if after is None and not activity_filter.has_client_side_filters:
+        items = await service.get_activities(activity_filter)
+        return _page_response(items, page, per_page, has_more=len(items) == per_page)
+
+    # Every page of one filter needs the same full fetch, so share it.
+    fetch_key = ("activities", activity_filter.model_dump_json(exclude={"page", "per_page"}))
+    fetched_activities = await run_once(
+        fetch_key, lambda: service.get_activities(activity_filter, all_pages=True)
+    )
+
+    total = len(fetched_activities)
+    total_pages = (total + per_page - 1) // per_page
+
+    # Apply pagination in memory
+    start_idx = (page - 1) * per_page
+    end_idx = start_idx + per_page
+    paginated_items = fetched_activities[start_idx:end_idx]
+
+    return _page_response(
+        paginated_items,
+        page,
+        per_page,
+        has_more=page < total_pages,
+        total=total,
+        total_pages=total_pages,
+    )
+
+
+def _page_response(
+    items: List[Activity],
+    page: int,
+    per_page: int,
+    has_more: bool,
+    total: Optional[int] = None,
+    total_pages: Optional[int] = None,
+) -> ORJSONResponse:
+    """Serialize a ``PaginatedResponse`` body from already-validated activities."""
+    return ORJSONResponse({
+        "items": _dump_models(items),
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "total_pages": total_pages,
+        "next_cursor": encode_cursor(items[-1].start_date) if has_more and items else None,
+    })
+
+
+def _dump_models(models: List[BaseModel]) -> List[dict]:
+    """Dump models to JSON-ready dicts without revalidating them as a response_model."""
+    return [model.model_dump(mode="json") for model in models]
+
+
+@router.get(
+    "/activities/no-gear",
+    response_class=ORJSONResponse,
+    responses={200: {"model": List[Activity]}},
+    summary="Get activities without gear",
+)
 async def get_activities_without_gear(
-    after: Optional[datetime] = Query(None, description="Activities after this date")
+    after: Optional[datetime] = Query(
+        None,
+        description="Activities after this date (default: the last "
+                    "STRAVA_NO_GEAR_LOOKBACK_DAYS days, 180 unless configured)",
+    )
 ):
-    """Get all activities that don't have gear assigned."""
+    """Get activities that don't have gear assigned.
+
+    Without ``after`` only the last ``STRAVA_NO_GEAR_LOOKBACK_DAYS`` days are
+    scanned (180 by default); set it to 0 to scan the whole history.
+    """
     try:
         activities = await service.get_activities_without_gear(after=after)
-        return activities
+        return ORJSONResponse(_dump_models(activities))
     except StravaAPIError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/activities/running", response_model=List[Activity], summary="Get running activities")
+@router.get(
+    "/activities/running",
+    response_class=ORJSONResponse,
+    responses={200: {"model": List[Activity]}},
+    summary="Get running activities",
+)
 async def get_running_activities(
     limit: Optional[int] = Query(None, ge=1, le=1000, description="Limit number of activities")
 ):
     """Get running activities specifically."""
     try:
         activities = await service.get_running_activities(limit)
-        return activities
+        return ORJSONResponse(_dump_models(activities))
     except StravaAPIError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -102,14 +213,16 @@ async def get_activity(activity_id: int):
         raise HTTPException(status_code=404, detail=str(e))
 
 
-@router.get("/gear", response_model=List[Gear], summary="Get athlete gear")
+@router.get(
+    "/gear",
+    response_class=ORJSONResponse,
+    responses={200: {"model": List[Gear]}},
+    summary="Get athlete gear",
+)
+@cached(ttl_policy="long")
 async def get_gear():
     """Get athlete's gear list (from backup + Garmin)."""
-    try:
-        gear = await service.get_athlete_gear()
-        return gear
-    except StravaAPIError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    return ORJSONResponse(_dump_models(await service.get_athlete_gear()))
 
 
 @router.post("/activities/{activity_id}/download-gpx", summary="Download GPX file")
@@ -132,89 +245,98 @@ async def download_gpx(
 @router.get("/activities/{activity_id}/gpx", summary="Get GPX file")
 async def get_gpx_file(
     activity_id: int,
+    request: Request,
     activity_name: Optional[str] = Query(None, description="Activity name for filename")
 ):
-    """Serve the downloaded GPX file."""
+    """Serve the downloaded GPX file, building it from Strava only on first request."""
+    file_path = service.stored_gpx_path(activity_id)
     try:
-        file_path = await service.download_gpx(activity_id, activity_name=activity_name)
-        return FileResponse(
-            path=file_path,
-            media_type='application/gpx+xml',
-            filename=os.path.basename(file_path)
-        )
+        if file_path is None:
+            file_path = await service.download_gpx(activity_id, activity_name=activity_name)
+        st = os.stat(file_path)
     except StravaAPIError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="GPX file not found")
 
+    # A GPX file is never rewritten in place, so mtime and size identify its content.
+    etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=86400"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    filename = f"{activity_name}.gpx" if activity_name else os.path.basename(file_path)
+    return FileResponse(
+        path=file_path,
+        media_type='application/gpx+xml',
+        filename=filename,
+        headers=headers,
+        stat_result=st,
+    )
 
-@router.get("/stats/summary", summary="Get activity statistics")
+
+@router.get("/stats/summary", response_class=ORJSONResponse, summary="Get activity statistics")
+@cached(ttl_policy="normal")
 async def get_activity_stats(
     range: Optional[str] = Query(None, description="Time range (1w, 1m, 3m, 1y, all)"),
     after: Optional[datetime] = Query(None, description="Custom after date"),
     before: Optional[datetime] = Query(None, description="Custom before date")
 ):
     """Get summary statistics of activities."""
-    try:
-        if range:
-            from datetime import timedelta
-            now = datetime.now()
-            if range == "1w":
-                after = now - timedelta(weeks=1)
-            elif range == "1m":
-                after = now - timedelta(days=30)
-            elif range == "3m":
-                after = now - timedelta(days=90)
-            elif range == "1y":
-                after = now - timedelta(days=365)
-            elif range == "all":
-                after = None
-                before = None
-
-        activity_filter = ActivityFilter(after=after, before=before)
-        activities = await service.get_activities(activity_filter, all_pages=True)
-
-        total_activities = len(activities)
-        total_distance = sum(activity.distance for activity in activities)
-        total_time = sum(activity.moving_time for activity in activities)
-        activities_without_gear = len([a for a in activities if a.gear_id is None])
-
-        activity_types = {}
-        activity_type_details = {}
-
-        for activity in activities:
-            a_type = activity.sport_type
-            activity_types[a_type] = activity_types.get(a_type, 0) + 1
-
-            if a_type not in activity_type_details:
-                activity_type_details[a_type] = {
-                    "count": 0,
-                    "distance_meters": 0.0,
-                    "distance_km": 0.0,
-                    "time_seconds": 0,
-                    "time_hours": 0.0
-                }
-
-            details = activity_type_details[a_type]
-            details["count"] += 1
-            details["distance_meters"] += activity.distance
-            details["time_seconds"] += activity.moving_time
-
-        for a_type, details in activity_type_details.items():
-            details["distance_km"] = round(details["distance_meters"] / 1000, 2)
-            details["time_hours"] = round(details["time_seconds"] / 3600, 2)
-
-        return {
-            "total": {
-                "count": total_activities,
-                "distance_meters": total_distance,
-                "distance_km": round(total_distance / 1000, 2),
-                "time_seconds": total_time,
-                "time_hours": round(total_time / 3600, 2),
-                "activities_without_gear": activities_without_gear,
-            },
-            "activity_types_count": activity_types,
-            "activity_types_detailed": activity_type_details
-        }
-    except StravaAPIError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    if range in _RANGE_TABLE:
+        after = datetime.now(timezone.utc) - _RANGE_TABLE[range]
+    elif range == "all":
+        after = None
+        before = None
+
+    activity_filter = ActivityFilter(after=after, before=before)
+    activities = await run_once(
+        ("activity_summaries", activity_filter.model_dump_json()),
+        lambda: service.get_activity_summaries(activity_filter),
+    )
+    # Aggregating a full history is CPU-bound; keep it off the event loop.
+    summary = await asyncio.to_thread(_summarize_activities, activities)
+    # The summary is plain floats/ints/strings, so skip jsonable_encoder.
+    return ORJSONResponse(summary)
+
+
+def _summarize_activities(activities: List[ActivitySummary]) -> dict:
+    """Aggregate count, distance and moving time overall and per sport type.
+
+    Only the per-type buckets are accumulated per activity; the overall totals
+    are derived from the (few) buckets instead of separate passes over the list.
+    """
+    activities_without_gear = 0
+    activity_type_details = defaultdict(
+        lambda: {"count": 0, "distance_meters": 0.0, "time_seconds": 0}
+    )
+
+    for activity in activities:
+        details = activity_type_details[activity.sport_type]
+        details["count"] += 1
+        details["distance_meters"] += activity.distance
+        details["time_seconds"] += activity.moving_time
+        if activity.gear_id is None:
+            activities_without_gear += 1
+
+    total_distance = sum(d["distance_meters"] for d in activity_type_details.values())
+    total_time = sum(d["time_seconds"] for d in activity_type_details.values())
+
+    activity_types = {}
+    for a_type, details in activity_type_details.items():
+        activity_types[a_type] = details["count"]
+        details["distance_km"] = round(details["distance_meters"] / 1000, 2)
+        details["time_hours"] = round(details["time_seconds"] / 3600, 2)
+
+    return {
+        "total": {
+            "count": len(activities),
+            "distance_meters": total_distance,
+            "distance_km": round(total_distance / 1000, 2),
+            "time_seconds": total_time,
+            "time_hours": round(total_time / 3600, 2),
+            "activities_without_gear": activities_without_gear,
+        },
+        "activity_types_count": activity_types,
+        "activity_types_detailed": dict(activity_type_details)
+    }
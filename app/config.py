@@ -15,6 +15,8 @@ class Settings(BaseSettings):
     strava_token_expires_at: int = Field(default=0, description="Strava API Token Expiration Timestamp")
     strava_token_file: str = Field(default="data/strava_tokens.json", description="Path to store tokens")
     strava_api_base_url: str = Field(default="https://www.strava.com/api/v3", description="Strava API Base URL")
+    strava_http_backend: str = Field(default="httpx", description="HTTP transport for Strava API calls (httpx or aiohttp)")
+    strava_no_gear_lookback_days: int = Field(default=180, description="Days of history scanned for activities without gear when no start date is given (0 scans all)")
 
     # Legacy Garmin settings are retained only so existing .env files remain valid.
     # User-facing runtime paths do not use them.
@@ -25,6 +27,8 @@ class Settings(BaseSettings):
     # Telegram Bot Configuration
     bot_api_token: str = Field(default="", description="Telegram Bot API Token")
     bot_state_file: str = Field(default="data/bot_state.json", description="Path to store bot state")
+    bot_check_cache_ttl: int = Field(default=900, description="Seconds to reuse gear check results before querying Strava again")
+    bot_drop_pending_updates: bool = Field(default=False, description="Discard Telegram updates sent while the bot was offline")
 
     # Application Configuration
     app_host: str = Field(default="0.0.0.0", description="Application host")
@@ -9,23 +9,36 @@ from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
-from app.api.routes import router as api_router
-from app.api.forecast_routes import router as forecast_router
+from app.api.health import api_router as health_api_router, router as health_router
+from app.api.responses import ORJSONResponse
+from app.api.routes import router as api_router, service as api_service
+from app.api.forecast_routes import router as forecast_router, service as forecast_service
 from app.config import settings
 
 from contextlib import asynccontextmanager
 from app.services.bot_service import BotService
+from app.services.strava_service import create_http_client
 
 # Bot service instance
 bot_service = BotService()
 
+# Strava clients used by the web UI, race forecast and bot
+strava_services = (api_service, forecast_service.activities, bot_service.activity_service)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: initialize the Telegram bot. Activity data comes from Strava API.
+    # Startup: share one keep-alive pool between all Strava service instances.
+    app.state.http = create_http_client()
+    for strava in strava_services:
+        strava.http_client = app.state.http
+
+    # Initialize the Telegram bot. Activity data comes from Strava API.
     await bot_service.initialize()
     yield
-    # Shutdown: Stop bot
+    # Shutdown: Stop bot and release pooled connections
     await bot_service.shutdown()
+    for strava in strava_services:
+        await strava.aclose()
 
 # Create FastAPI app
 app = FastAPI(
@@ -34,6 +47,7 @@ app = FastAPI(
     version="0.1.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -59,6 +73,8 @@ def render_template(request: Request, name: str):
     return templates.TemplateResponse(name, context)
 
 # Include API routes
+app.include_router(health_router)
+app.include_router(health_api_router, prefix="/api/v1", tags=["Strava API"])
 app.include_router(api_router, prefix="/api/v1", tags=["Strava API"])
 app.include_router(forecast_router, prefix="/api/v1", tags=["Race Forecast"])
 
@@ -75,16 +91,6 @@ async def race_forecast_page(request: Request):
     return render_template(request, "race_forecast.html")
 
 
-@app.get("/health")
-async def health_check():
-    """Health check endpoint."""
-    return {
-        "status": "healthy",
-        "app": "Strava NoShoes",
-        "version": "0.1.0"
-    }
-
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -1,8 +1,10 @@
 """Pydantic models for Strava API data structures."""
 
 from datetime import datetime
-from typing import Optional, List
-from pydantic import BaseModel, Field
+from typing import Any, Generic, Optional, List, Tuple, TypeVar
+from pydantic import BaseModel, Field, PrivateAttr
+
+T = TypeVar("T")
 
 
 class StravaTokens(BaseModel):
@@ -55,7 +57,21 @@ class ActivityMap(BaseModel):
     resource_state: int
 
 
-class Activity(BaseModel):
+class _StartTimestamp(BaseModel):
+    """Base for activity models that declare a ``start_date`` field."""
+
+    # Epoch seconds of start_date, computed once for date filtering and sorting.
+    _start_ts: float = PrivateAttr(default=0.0)
+
+    def model_post_init(self, context: Any, /) -> None:
+        self._start_ts = self.start_date.timestamp()
+
+    @property
+    def start_ts(self) -> float:
+        return self._start_ts
+
+
+class Activity(_StartTimestamp):
     """Strava activity model."""
     source: Optional[str] = None
     resource_state: int
@@ -116,6 +132,35 @@ class Activity(BaseModel):
     suffer_score: Optional[int] = None
 
 
+class ActivitySummary(_StartTimestamp):
+    """Fields of a Strava activity needed for statistics.
+
+    Validating six fields instead of the full ``Activity`` (with nested athlete
+    and map models) keeps aggregation over the whole history cheap.
+    """
+    id: int
+    sport_type: str
+    distance: float
+    moving_time: int
+    gear_id: Optional[str] = None
+    start_date: datetime
+
+
+class Stream(BaseModel, Generic[T]):
+    """Samples of one Strava activity stream."""
+    data: List[T]
+
+
+class ActivityStreams(BaseModel):
+    """Activity streams requested with ``key_by_type=true``; absent streams are None."""
+    latlng: Optional[Stream[Tuple[float, float]]] = None
+    altitude: Optional[Stream[float]] = None
+    time: Optional[Stream[int]] = None
+    heartrate: Optional[Stream[int]] = None
+    cadence: Optional[Stream[int]] = None
+    temp: Optional[Stream[int]] = None
+
+
 class ActivityFilter(BaseModel):
     """Filter parameters for activities."""
     before: Optional[datetime] = Field(None, description="Activities before this date")
@@ -126,6 +171,15 @@ class ActivityFilter(BaseModel):
     has_gear: Optional[bool] = Field(None, description="Filter activities with/without gear")
     gear_id: Optional[str] = Field(None, description="Filter by specific gear ID")
 
+    @property
+    def has_client_side_filters(self) -> bool:
+        """Whether any filter must be applied locally because Strava cannot."""
+        return (
+            self.activity_type is not None
+            or self.has_gear is not None
+            or self.gear_id is not None
+        )
+
 
 class GPXDownloadRequest(BaseModel):
     """Request model for GPX download."""
@@ -134,9 +188,14 @@ class GPXDownloadRequest(BaseModel):
 
 
 class PaginatedResponse(BaseModel):
-    """Paginated response model."""
+    """Paginated response model.
+
+    ``total``/``total_pages`` are ``None`` for cursor pages, which do not scan
+    the whole history. ``next_cursor`` is set while more items may follow.
+    """
     items: List[Activity]
-    total: int
+    total: Optional[int] = None
     page: int
     per_page: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
@@ -1,18 +1,25 @@
 
 import asyncio
-import json
+import functools
+import html
 import logging
 import os
-from datetime import time as dt_time
-from typing import Optional
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, time as dt_time
+from typing import Dict, List, Optional, Tuple
 
+import aiofiles
+import orjson
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, ContextTypes, filters
+from telegram.ext import AIORateLimiter, Application, CommandHandler, MessageHandler, CallbackQueryHandler, ContextTypes, filters
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 
 from app.config import settings
+from app.models.strava import Activity
 from app.services.strava_service import StravaService
+from app.utils.singleflight import run_once
 from app.utils.gpx_cleanup import cleanup_all_gpx_files
 import re
 
@@ -23,6 +30,56 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+STRAVA_ACTIVITY_URL = "https://www.strava.com/activities/"
+_STRAVA_LINK_RE = re.compile(r'https://www\.strava\.com/activities/(\d+)')
+# 24-hour "H:MM" or "HH:MM"; the ranges reject out-of-range times.
+_HHMM_RE = re.compile(r'^([01]?\d|2[0-3]):([0-5]\d)$')
+
+# Seconds a GPX send may take before a "Downloading..." message is shown.
+PROGRESS_MESSAGE_DELAY = 0.5
+
+# Times a Telegram call is retried after a RetryAfter (flood control) response.
+TELEGRAM_SEND_RETRIES = 3
+
+# Daily check jobs are named by this prefix plus their "HH:MM" time.
+DAILY_CHECK_JOB_PREFIX = "daily_check_"
+
+# Activity names remembered from links so the GPX button can skip a Strava lookup.
+ACTIVITY_NAME_CACHE_SIZE = 256
+
+# Reply to a shared activity link; {pace} and {gear} are empty when unknown.
+_ACTIVITY_CARD_TEMPLATE = (
+    "🏃 <b>{name}</b>\n"
+    "📅 {date}\n"
+    "🏷 Type: {sport}\n"
+    "📏 Distance: {distance_km:.2f} km\n"
+    "⏱ Time: {duration_min} min{pace}\n"
+    "{gear}"
+)
+
+
+@functools.lru_cache(maxsize=4096)
+def _gpx_markup(activity_id: int) -> InlineKeyboardMarkup:
+    """Return the GPX download keyboard for an activity.
+
+    Telegram objects are immutable, so one markup can be reused for every
+    reply about the same activity.
+    """
+    return InlineKeyboardMarkup(
+        [[InlineKeyboardButton("📥 Download GPX", callback_data=f"gpx_{activity_id}")]]
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def _format_pace(average_speed: float) -> str:
+    """Format a speed in m/s as a card line with the pace in min/km."""
+    pace_sec_per_km = 1000 / average_speed
+    pace_min = int(pace_sec_per_km // 60)
+    pace_sec = int(pace_sec_per_km % 60)
+    return f"\n📈 Pace: {pace_min}:{pace_sec:02d} min/km"
+
+
 class BotService:
     def __init__(self):
         self.token = settings.bot_api_token
@@ -30,34 +87,72 @@ class BotService:
         self.activity_service = StravaService()
         self.scheduler = AsyncIOScheduler()
         self.application = None
+        self._activity_names: "OrderedDict[int, str]" = OrderedDict()
+        # after-date bucket -> (monotonic fetch time, activities without gear)
+        self._no_gear_cache: Dict[Optional[datetime], Tuple[float, List[Activity]]] = {}
 
-        # Load state
+        # Load state; the directory is created once here rather than on every save
+        if state_dir := os.path.dirname(self.state_file):
+            os.makedirs(state_dir, exist_ok=True)
         self.state = self._load_state()
+        self._saved_state: Optional[bytes] = None
+        # Updates are handled concurrently; saves share one temp file
+        self._state_lock = asyncio.Lock()
 
     def _load_state(self) -> dict:
         """Load bot state from file."""
-        if os.path.exists(self.state_file):
-            try:
-                with open(self.state_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.error(f"Error loading bot state: {e}")
-        return {"chat_id": None, "schedule_time": None}
-
-    def _save_state(self):
-        """Save bot state to file."""
-        os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
         try:
-            with open(self.state_file, 'w') as f:
-                json.dump(self.state, f)
+            with open(self.state_file, 'rb') as f:
+                return self._migrate_state(orjson.loads(f.read()))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Error loading bot state: {e}")
+        return {"subscribers": {}}
+
+    @staticmethod
+    def _migrate_state(state: dict) -> dict:
+        """Convert the single-chat state layout to per-chat subscribers.
+
+        Subscribers map a chat id (as a string, since JSON keys are strings)
+        to its daily "HH:MM" check time.
+        """
+        if "subscribers" in state:
+            return state
+        subscribers = {}
+        if state.get("chat_id") and state.get("schedule_time"):
+            subscribers[str(state["chat_id"])] = state["schedule_time"]
+        return {"subscribers": subscribers}
+
+    async def _save_state(self):
+        """Save bot state to file, skipping the write when nothing changed."""
+        async with self._state_lock:
+            await self._write_state()
+
+    async def _write_state(self):
+        """Write the current state; the caller must hold ``_state_lock``."""
+        data = orjson.dumps(self.state)
+        if data == self._saved_state:
+            return
+        tmp_file = f"{self.state_file}.tmp"
+        try:
+            # Write beside the target and rename so a crash never leaves a partial file
+            async with aiofiles.open(tmp_file, 'wb') as f:
+                await f.write(data)
+            await asyncio.to_thread(os.replace, tmp_file, self.state_file)
+            self._saved_state = data
         except Exception as e:
             logger.error(f"Error saving bot state: {e}")
 
+    def _remember_activity_name(self, activity_id: int, name: str):
+        """Remember an activity name, evicting the least recently used entry."""
+        self._activity_names[activity_id] = name
+        self._activity_names.move_to_end(activity_id)
+        if len(self._activity_names) > ACTIVITY_NAME_CACHE_SIZE:
+            self._activity_names.popitem(last=False)
+
     async def start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command."""
-        chat_id = update.effective_chat.id
-        self.state["chat_id"] = chat_id
-        self._save_state()
         await update.message.reply_text(
             f"Hello! I am ready to check your activities.\n"
             f"Data source: Strava API.\n\n"
@@ -74,12 +169,12 @@ class BotService:
 
     async def schedule_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /schedule command."""
-        from datetime import datetime
         now = datetime.now()
         logger.info(f"Schedule command received from {update.effective_chat.id}. Server time: {now}")
 
+        chat_key = str(update.effective_chat.id)
         if not context.args:
-            current_schedule = self.state.get("schedule_time")
+            current_schedule = self.state["subscribers"].get(chat_key)
             if current_schedule:
                 await update.message.reply_text(
                     f"Current schedule: {current_schedule}\n"
@@ -98,37 +193,42 @@ class BotService:
 
         time_str = context.args[0]
         try:
-            hour, minute = map(int, time_str.split(':'))
-            if not (0 <= hour <= 23 and 0 <= minute <= 59):
+            match = _HHMM_RE.match(time_str)
+            if not match:
                 raise ValueError
+            hour, minute = int(match[1]), int(match[2])
 
-            self.state["schedule_time"] = f"{hour:02d}:{minute:02d}"
-            self._save_state()
+            async with self._state_lock:
+                self.state["subscribers"][chat_key] = f"{hour:02d}:{minute:02d}"
+                await self._write_state()
 
-            # Reschedule
-            self._schedule_job(hour, minute)
+                # Reschedule
+                self._sync_schedule_jobs()
 
             await update.message.reply_text(
                 f"Daily check scheduled for {hour:02d}:{minute:02d}.\n"
-                f"Server time: {datetime.now().strftime('%H:%M')}"
+                f"Server time: {now.strftime('%H:%M')}"
             )
         except ValueError:
             await update.message.reply_text("Invalid time format. Please use HH:MM (24-hour).")
 
     async def stop_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /stop command."""
-        self.state["schedule_time"] = None
-        self._save_state()
-        self.scheduler.remove_all_jobs()
+        async with self._state_lock:
+            self.state["subscribers"].pop(str(update.effective_chat.id), None)
+            await self._write_state()
+            self._sync_schedule_jobs()
         await update.message.reply_text("Daily schedule stopped.")
 
     async def handle_activity_link(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle messages containing Strava activity links."""
         message_text = update.message.text
 
-        strava_pattern = r'https://www\.strava\.com/activities/(\d+)'
+        # Most chat messages are not links; skip the regex for them.
+        if 'strava.com/activities/' not in message_text:
+            return
 
-        match = re.search(strava_pattern, message_text)
+        match = _STRAVA_LINK_RE.search(message_text)
 
         if not match:
             return
@@ -139,41 +239,29 @@ class BotService:
         try:
             await update.message.reply_text("📊 Fetching activity details...")
             activity = await self.activity_service.get_activity_by_id(activity_id)
+            self._remember_activity_name(activity_id, activity.name)
 
-            # Format activity details
-            distance_km = activity.distance / 1000
-            duration_min = activity.moving_time / 60
-            pace_str = ""
-
+            pace = ""
             if activity.average_speed and activity.average_speed > 0:
-                pace_sec_per_km = 1000 / activity.average_speed
-                pace_min = int(pace_sec_per_km // 60)
-                pace_sec = int(pace_sec_per_km % 60)
-                pace_str = f"\n📈 Pace: {pace_min}:{pace_sec:02d} min/km"
-
-            message = (
-                f"🏃 <b>{activity.name}</b>\n"
-                f"📅 {activity.start_date.strftime('%Y-%m-%d %H:%M')}\n"
-                f"🏷 Type: {activity.sport_type}\n"
-                f"📏 Distance: {distance_km:.2f} km\n"
-                f"⏱ Time: {int(duration_min)} min"
-                f"{pace_str}\n"
-            )
-
+                pace = _format_pace(activity.average_speed)
+            # Names are user text; escape them so the HTML parse mode cannot reject the message
+            gear = ""
             if activity.gear_id:
-                gear_name = activity.gear_name or activity.gear_id
-                message += f"\n👟 Gear: {gear_name}"
-
-            # Create inline keyboard with GPX download button
-            keyboard = [
-                [InlineKeyboardButton("📥 Download GPX", callback_data=f"gpx_{activity_id}")]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
+                gear = f"\n👟 Gear: {html.escape(activity.gear_name or activity.gear_id)}"
+            message = _ACTIVITY_CARD_TEMPLATE.format(
+                name=html.escape(activity.name),
+                date=activity.start_date.strftime('%Y-%m-%d %H:%M'),
+                sport=activity.sport_type,
+                distance_km=activity.distance / 1000,
+                duration_min=activity.moving_time // 60,
+                pace=pace,
+                gear=gear,
+            )
 
             await update.message.reply_text(
                 message,
                 parse_mode='HTML',
-                reply_markup=reply_markup
+                reply_markup=_gpx_markup(activity_id)
             )
 
         except Exception as e:
@@ -206,13 +294,9 @@ class BotService:
         query = update.callback_query
         await query.answer()
 
-        callback_data = query.data
-        if not callback_data.startswith("gpx_"):
-            await query.edit_message_text("Invalid callback data.")
-            return
-
         try:
-            activity_id = int(callback_data.split("_")[1])
+            # The handler pattern guarantees "gpx_<digits>"
+            activity_id = int(query.data[4:])
             chat_id = query.message.chat_id
             await self.download_and_send_gpx(chat_id, activity_id, query)
         except Exception as e:
@@ -225,38 +309,50 @@ class BotService:
             logger.warning("Bot application not initialized")
             return
 
+        progress_task = None
+        progress_sending = asyncio.Event()
         try:
             if query:
                 await query.edit_message_text("📥 Downloading GPX file...")
             else:
-                progress_msg = await self.application.bot.send_message(
-                    chat_id=chat_id,
-                    text="📥 Downloading GPX file..."
+                # Only announce the download if it is slow; fast sends skip two messages.
+                progress_task = asyncio.create_task(
+                    self._send_progress_later(chat_id, "📥 Downloading GPX file...", progress_sending)
                 )
 
-            # Get activity details first
-            activity = await self.activity_service.get_activity_by_id(activity_id)
+            # The link handler usually saw this activity already; otherwise fetch it
+            # once and hand it to download_gpx so it is not fetched again.
+            activity_name = self._activity_names.get(activity_id)
+            activity = None
+            if activity_name is None:
+                activity = await self.activity_service.get_activity_by_id(activity_id)
+                activity_name = activity.name
+                self._remember_activity_name(activity_id, activity_name)
 
             # Download GPX through Strava streams.
             gpx_path = await self.activity_service.download_gpx(
                 activity_id,
-                activity_name=activity.name
+                activity_name=activity_name,
+                activity=activity
             )
 
-            # Send GPX file
-            with open(gpx_path, 'rb') as gpx_file:
-                await self.application.bot.send_document(
-                    chat_id=chat_id,
-                    document=gpx_file,
-                    filename=f"{activity.name}.gpx",
-                    caption=f"📊 GPX file for: {activity.name}"
-                )
+            # Send GPX file, reading it without blocking the event loop
+            async with aiofiles.open(gpx_path, 'rb') as gpx_file:
+                gpx_data = await gpx_file.read()
+            await self.application.bot.send_document(
+                chat_id=chat_id,
+                document=gpx_data,
+                filename=f"{activity_name}.gpx",
+                caption=f"📊 GPX file for: {activity_name}"
+            )
 
             success_msg = "✅ GPX file sent successfully!"
             if query:
                 await query.edit_message_text(success_msg)
             else:
-                await progress_msg.edit_text(success_msg)
+                progress_msg = await self._stop_progress(progress_task, progress_sending)
+                if progress_msg:
+                    await progress_msg.edit_text(success_msg)
 
             logger.info(f"Successfully sent GPX file for activity {activity_id} to chat {chat_id}")
 
@@ -267,30 +363,108 @@ class BotService:
             if query:
                 await query.edit_message_text(error_msg)
             else:
+                await self._stop_progress(progress_task, progress_sending)
                 await self.application.bot.send_message(chat_id=chat_id, text=error_msg)
 
-    def _schedule_job(self, hour: int, minute: int):
-        """Schedule the daily check job."""
-        self.scheduler.remove_all_jobs()
-        self.scheduler.add_job(
-            self.scheduled_check,
-            CronTrigger(hour=hour, minute=minute),
-            id="daily_check",
-            replace_existing=True
-        )
-        logger.info(f"Scheduled job for {hour}:{minute}")
-
-    async def scheduled_check(self):
-        """The job that runs on schedule."""
-        logger.info("Executed scheduled_check job")
-        chat_id = self.state.get("chat_id")
-        if chat_id:
-            await self.check_activities_without_gear(chat_id, days_back=1, silent_if_empty=True)
+    async def _send_progress_later(self, chat_id: int, text: str, sending: asyncio.Event):
+        """Send a progress message after PROGRESS_MESSAGE_DELAY seconds."""
+        await asyncio.sleep(PROGRESS_MESSAGE_DELAY)
+        sending.set()
+        return await self.application.bot.send_message(chat_id=chat_id, text=text)
+
+    @staticmethod
+    async def _stop_progress(progress_task: Optional[asyncio.Task], sending: asyncio.Event):
+        """Cancel a progress message still waiting out its delay, else return it.
+
+        Once the send has started it is awaited rather than cancelled, so a
+        delivered message is never left behind without its follow-up edit.
+        """
+        if progress_task is None:
+            return None
+        if not sending.is_set():
+            progress_task.cancel()
+            return None
+        try:
+            return await progress_task
+        except Exception as e:
+            logger.warning(f"Progress message was not sent: {e}")
+            return None
+
+    def _sync_schedule_jobs(self):
+        """Keep one daily check job per distinct subscriber time.
+
+        Chats sharing a time share a job, so each time slot costs a single
+        Strava fetch however many chats subscribed to it. Other jobs, such as
+        the GPX cleanup, are left untouched.
+        """
+        schedule_times = set(self.state["subscribers"].values())
+        wanted = {f"{DAILY_CHECK_JOB_PREFIX}{t}": t for t in schedule_times}
+
+        for job in self.scheduler.get_jobs():
+            if job.id.startswith(DAILY_CHECK_JOB_PREFIX) and job.id not in wanted:
+                self.scheduler.remove_job(job.id)
+
+        for job_id, schedule_time in wanted.items():
+            hour, minute = map(int, schedule_time.split(':'))
+            self.scheduler.add_job(
+                self.scheduled_check,
+                CronTrigger(hour=hour, minute=minute),
+                args=[schedule_time],
+                id=job_id,
+                replace_existing=True
+            )
+            logger.info(f"Scheduled job for {schedule_time}")
+
+    async def scheduled_check(self, schedule_time: str):
+        """The job that runs on schedule for every chat subscribed at schedule_time."""
+        logger.info(f"Executed scheduled_check job for {schedule_time}")
+        chat_ids = [
+            int(chat_id) for chat_id, chat_time in self.state["subscribers"].items()
+            if chat_time == schedule_time
+        ]
+        if chat_ids:
+            await self._send_gear_report(chat_ids, days_back=1, silent_if_empty=True)
         else:
-            logger.warning("Scheduled check triggered but no chat_id found.")
+            logger.warning(f"Scheduled check for {schedule_time} found no subscribed chats.")
+
+    async def _get_activities_without_gear(self, after_date: Optional[datetime]) -> List[Activity]:
+        """Get activities without gear, reusing recent results for the same hour bucket.
+
+        Rounding ``after_date`` down to the hour lets repeated checks share a
+        cache entry; concurrent checks share a single Strava fetch. The shared
+        result is then trimmed back to the exact ``after_date``.
+        """
+        key = after_date.replace(minute=0, second=0, microsecond=0) if after_date else None
+        now = time.monotonic()
+        cached = self._no_gear_cache.get(key)
+        if cached and now - cached[0] < settings.bot_check_cache_ttl:
+            return self._started_after(cached[1], after_date)
+
+        activities = await run_once(
+            ("activities_without_gear", key),
+            lambda: self.activity_service.get_activities_without_gear(after=key),
+        )
+        self._no_gear_cache = {
+            k: v for k, v in self._no_gear_cache.items()
+            if now - v[0] < settings.bot_check_cache_ttl
+        }
+        self._no_gear_cache[key] = (now, activities)
+        return self._started_after(activities, after_date)
+
+    @staticmethod
+    def _started_after(activities: List[Activity], after_date: Optional[datetime]) -> List[Activity]:
+        """Drop activities that started at or before ``after_date``."""
+        if after_date is None:
+            return activities
+        after_ts = after_date.timestamp()
+        return [a for a in activities if a.start_ts > after_ts]
 
     async def check_activities_without_gear(self, chat_id: int, days_back: int = None, silent_if_empty: bool = False):
         """Check for activities without gear and notify."""
+        await self._send_gear_report([chat_id], days_back, silent_if_empty)
+
+    async def _send_gear_report(self, chat_ids: List[int], days_back: int = None, silent_if_empty: bool = False):
+        """Check for activities without gear once and send the result to every chat."""
         if not self.application:
             logger.warning("Bot application not initialized")
             return
@@ -298,32 +472,37 @@ class BotService:
         try:
             after_date = None
             if days_back:
-                from datetime import timedelta, datetime
                 after_date = datetime.now() - timedelta(days=days_back)
-                logger.info(f"Checking activities without gear for chat {chat_id}, days_back={days_back}, after={after_date}")
+                logger.info(f"Checking activities without gear for chats {chat_ids}, days_back={days_back}, after={after_date}")
 
-            activities = await self.activity_service.get_activities_without_gear(after=after_date)
+            activities = await self._get_activities_without_gear(after_date)
             logger.info(f"Found {len(activities)} activities without gear")
 
             if not activities:
                 logger.info(f"No activities without gear found. Silent mode: {silent_if_empty}")
                 if not silent_if_empty:
-                    await self.application.bot.send_message(chat_id=chat_id, text="All good! No activities without gear found in the specified period. 👍")
+                    await self._broadcast(chat_ids, text="All good! No activities without gear found in the specified period. 👍")
                 else:
                     logger.info("Silent mode active, sending no message.")
                 return
 
-            time_msg = f" (last {days_back} days)" if days_back else ""
-            message = f"⚠️ Found {len(activities)} activities without gear{time_msg}:\n\n"
-            for activity in activities[:10]:
-                link = f"https://www.strava.com/activities/{activity.id}"
-                message += f"• <a href='{link}'>{activity.name}</a> ({activity.start_date.strftime('%Y-%m-%d')})\n"
+            # Without days_back the service scans its default lookback window
+            lookback_days = days_back or settings.strava_no_gear_lookback_days
+            time_msg = f" (last {lookback_days} days)" if lookback_days else ""
+            lines = [f"⚠️ Found {len(activities)} activities without gear{time_msg}:", ""]
+            # Names are user text; escape them so the HTML parse mode cannot reject the message
+            lines.extend(
+                f"• <a href='{STRAVA_ACTIVITY_URL}{activity.id}'>{html.escape(activity.name)}</a>"
+                f" ({activity.start_date.strftime('%Y-%m-%d')})"
+                for activity in activities[:10]
+            )
 
             if len(activities) > 10:
-                message += f"\n...and {len(activities) - 10} more."
+                lines.extend(["", f"...and {len(activities) - 10} more."])
+            message = "\n".join(lines)
 
-            await self.application.bot.send_message(
-                chat_id=chat_id,
+            await self._broadcast(
+                chat_ids,
                 text=message,
                 parse_mode='HTML',
                 disable_web_page_preview=True
@@ -331,13 +510,24 @@ class BotService:
 
         except Exception as e:
             logger.error(f"Error in check_activities_without_gear: {e}")
-            await self.application.bot.send_message(chat_id=chat_id, text=f"Error checking activities: {str(e)}")
+            await self._broadcast(chat_ids, text=f"Error checking activities: {str(e)}")
+
+    async def _broadcast(self, chat_ids: List[int], **message_kwargs):
+        """Send the same message to several chats concurrently."""
+        results = await asyncio.gather(
+            *(self.application.bot.send_message(chat_id=chat_id, **message_kwargs) for chat_id in chat_ids),
+            return_exceptions=True
+        )
+        for chat_id, result in zip(chat_ids, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error sending message to chat {chat_id}: {result}")
 
     async def cleanup_gpx_job(self):
         """Scheduled job to clean up all GPX files."""
         logger.info("Running GPX cleanup job...")
         try:
-            stats = cleanup_all_gpx_files(settings.gpx_storage_path)
+            # The directory walk and unlinks are blocking; keep them off the event loop.
+            stats = await asyncio.to_thread(cleanup_all_gpx_files, settings.gpx_storage_path)
 
             if stats['errors']:
                 logger.warning(f"GPX cleanup completed with errors: {stats['errors']}")
@@ -355,21 +545,35 @@ class BotService:
             logger.warning("Bot token not configured. Telegram bot will not start.")
             return
 
-        self.application = Application.builder().token(self.token).build()
+        # Handlers only wait on Strava, disk and Telegram, so process updates
+        # concurrently instead of queueing everyone behind a slow GPX download.
+        # block=True only orders handlers within one update, so /schedule and
+        # /stop change subscribers under _state_lock.
+        # The rate limiter keeps fan-out sends under Telegram's 30 msg/s bot limit
+        # and waits out RetryAfter responses instead of failing the send.
+        self.application = (
+            Application.builder()
+            .token(self.token)
+            .concurrent_updates(True)
+            .rate_limiter(AIORateLimiter(max_retries=TELEGRAM_SEND_RETRIES))
+            .build()
+        )
 
         self.application.add_handler(CommandHandler("start", self.start))
-        self.application.add_handler(CommandHandler("check", self.check_command))
+        self.application.add_handler(CommandHandler("check", self.check_command, block=False))
         self.application.add_handler(CommandHandler("schedule", self.schedule_command))
         self.application.add_handler(CommandHandler("stop", self.stop_command))
-        self.application.add_handler(CommandHandler("gpx", self.gpx_command))
+        self.application.add_handler(CommandHandler("gpx", self.gpx_command, block=False))
 
         # Message handler for Strava activity links.
         self.application.add_handler(
-            MessageHandler(filters.TEXT & ~filters.COMMAND, self.handle_activity_link)
+            MessageHandler(
+                filters.TEXT & ~filters.COMMAND, self.handle_activity_link, block=False
+            )
         )
 
         # Callback query handler for inline buttons
-        self.application.add_handler(CallbackQueryHandler(self.handle_gpx_callback))
+        self.application.add_handler(CallbackQueryHandler(self.handle_gpx_callback, pattern=r"^gpx_\d+$", block=False))
 
         await self.application.initialize()
         await self.application.start()
@@ -393,13 +597,18 @@ class BotService:
                 f"{settings.gpx_cleanup_schedule_minute:02d} daily"
             )
 
-        # Restore schedule if exists
-        stored_time = self.state.get("schedule_time")
-        if stored_time:
-            h, m = map(int, stored_time.split(':'))
-            self._schedule_job(h, m)
-
-        await self.application.updater.start_polling()
+        # Restore subscriber schedules
+        self._sync_schedule_jobs()
+
+        # Long-poll for the only update types handled here and keep retrying the
+        # first connection. Updates queued while the bot was down are answered
+        # unless BOT_DROP_PENDING_UPDATES opts out.
+        await self.application.updater.start_polling(
+            timeout=30,
+            bootstrap_retries=-1,
+            drop_pending_updates=settings.bot_drop_pending_updates,
+            allowed_updates=[Update.MESSAGE, Update.CALLBACK_QUERY]
+        )
         logger.info("Telegram bot started (data source: Strava API).")
 
     async def shutdown(self):
@@ -412,3 +621,6 @@ class BotService:
             await self.application.stop()
             await self.application.shutdown()
             logger.info("Telegram bot stopped.")
+
+        # Release the Strava keep-alive pool used by the handlers.
+        await self.activity_service.aclose()
@@ -1,5 +1,6 @@
 """GPX parsing and a transparent first-version trail race forecast."""
 
+import asyncio
 import math
 import re
 from dataclasses import dataclass
@@ -24,6 +25,10 @@ from app.models.forecast import (
 from app.models.strava import Activity, ActivityFilter
 from app.services.strava_service import StravaAPIError, StravaService
 
+# Upper bound on concurrent activity lookups for one forecast; the selection is
+# not capped, and every lookup counts against Strava's 15-minute request budget.
+ACTIVITY_FETCH_CONCURRENCY = 4
+
 
 class ForecastServiceError(Exception):
     """Expected validation or data error in race forecasting."""
@@ -181,13 +186,34 @@ class ForecastService:
 
     async def calculate(self, request: ForecastRequest) -> ForecastResponse:
         route = self.load_route(request.route_id)
-        selected = []
-        for selection in request.activities:
-            try:
-                activity = await self.activities.get_activity_by_id(selection.activity_id)
-            except StravaAPIError as exc:
-                raise ForecastServiceError(str(exc)) from exc
-            selected.append((activity, selection))
+        # Activities are independent Strava lookups, so fetch each distinct one
+        # concurrently, a few at a time.
+        semaphore = asyncio.Semaphore(ACTIVITY_FETCH_CONCURRENCY)
+
+        async def fetch_activity(activity_id: int) -> Activity:
+            async with semaphore:
+                return await self.activities.get_activity_by_id(activity_id)
+
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tasks = {
+                    activity_id: tg.create_task(fetch_activity(activity_id))
+                    for activity_id in dict.fromkeys(
+                        selection.activity_id for selection in request.activities
+                    )
+                }
+        except ExceptionGroup as group:
+            strava_errors = group.subgroup(StravaAPIError)
+            if strava_errors:
+                error = strava_errors.exceptions[0]
+                raise ForecastServiceError(str(error)) from error
+            if len(group.exceptions) == 1:
+                raise group.exceptions[0] from None
+            raise
+        selected = [
+            (tasks[selection.activity_id].result(), selection)
+            for selection in request.activities
+        ]
 
         if not any(selection.is_race for _, selection in selected):
             raise ForecastServiceError("Mark at least one selected activity as a race")
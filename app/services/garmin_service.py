@@ -10,6 +10,7 @@ from garminconnect import Garmin, GarminConnectAuthenticationError
 
 from app.config import settings
 from app.models.strava import Activity, Gear  # Reuse existing Pydantic models
+from app.utils.file_utils import safe_filename
 
 logger = logging.getLogger(__name__)
 
@@ -274,7 +275,7 @@ class GarminService:
             except Exception:
                 activity_name = f"activity_{activity_id}"
 
-        safe_name = activity_name.replace(' ', '_').replace('/', '_').replace('\\', '_')
+        safe_name = safe_filename(activity_name)
         filename = f"{safe_name}.gpx"
         file_path = os.path.join(save_path, filename)
 
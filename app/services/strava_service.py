@@ -2,20 +2,177 @@
 
 import asyncio
 import os
-import json
+from bisect import bisect_left
+from collections import OrderedDict
+from itertools import zip_longest
+from operator import attrgetter
 import time
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable, Iterable, Tuple
 import httpx
+import orjson
+from pydantic import TypeAdapter
 from app.config import settings
-from app.models.strava import Activity, Athlete, Gear, StravaTokens, ActivityFilter
+from app.utils.singleflight import run_once
+from app.models.strava import (
+    Activity,
+    ActivityFilter,
+    ActivityStreams,
+    ActivitySummary,
+    Athlete,
+    Gear,
+    StravaTokens,
+)
 
-import gpxpy
-import gpxpy.gpx
+from lxml import etree
 
 
 _TOKEN_REFRESH_LOCKS: Dict[str, asyncio.Lock] = {}
+# Gear id -> name maps shared by every service instance using the same token.
+_GEAR_NAME_CACHES: Dict[str, Dict[str, str]] = {}
+
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+HTTP_TIMEOUT = 30.0
+
+# Strava caps list endpoints at 200 items per page.
+STRAVA_MAX_PER_PAGE = 200
+# Upper bound on concurrently requested activity pages. Every page past the end
+# of the history is a wasted call against Strava's 15-minute request budget.
+PAGE_FETCH_CONCURRENCY = 4
+# Upper bound on concurrent gear detail requests.
+GEAR_FETCH_CONCURRENCY = 10
+# Recently listed or fetched activities kept so GPX builds can skip a detail lookup.
+ACTIVITY_CACHE_SIZE = 512
+# GET responses remembered with their ETag for conditional revalidation.
+ETAG_CACHE_SIZE = 256
+# Activity list query parameters that make a page unlikely to be requested again.
+_TRANSIENT_LIST_PARAMS = ("after", "before")
+# Retries for HTTP 429 responses, waiting RATE_LIMIT_BACKOFF * 2**attempt seconds.
+RATE_LIMIT_RETRIES = 2
+RATE_LIMIT_BACKOFF = 1.0
+
+_ACTIVITIES = TypeAdapter(List[Activity])
+_ACTIVITY_SUMMARIES = TypeAdapter(List[ActivitySummary])
+
+
+def _parse_activities(data: List[Dict[str, Any]]) -> List[Activity]:
+    """Validate a Strava activity list in one call and tag it with its source."""
+    activities = _ACTIVITIES.validate_python(data)
+    for activity in activities:
+        activity.source = "strava"
+    return activities
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Build the pooled client used for Strava API calls.
+
+    With ``STRAVA_HTTP_BACKEND=aiohttp`` the httpx API is kept but requests go
+    through an aiohttp connection pool (requires ``pip install httpx-aiohttp``).
+    Must be called from a running event loop.
+    """
+    if settings.strava_http_backend == "aiohttp":
+        import aiohttp
+        from httpx_aiohttp import AiohttpTransport
+
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=HTTP_LIMITS.max_connections,
+                ttl_dns_cache=300,
+                keepalive_timeout=60,
+            )
+        )
+        return httpx.AsyncClient(
+            timeout=HTTP_TIMEOUT, transport=AiohttpTransport(client=session)
+        )
+    return httpx.AsyncClient(timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+
+
+GPX_NS = "http://www.topografix.com/GPX/1/1"
+TPE_NS = "http://www.garmin.com/xmlschemas/TrackPointExtension/v1"
+XSI_NS = "http://www.w3.org/2001/XMLSchema-instance"
+
+
+def _format_gpx_time(value: datetime) -> str:
+    return value.isoformat().replace("+00:00", "Z")
+
+
+def _render_gpx(
+    activity_id: int, name: str, start_time: datetime, streams: ActivityStreams
+) -> bytes:
+    """Serialize activity streams as GPX 1.1 with Garmin heart rate/cadence extensions."""
+    latlngs = streams.latlng.data
+    times = streams.time.data if streams.time else []
+    altitudes = streams.altitude.data if streams.altitude else []
+    heartrates = streams.heartrate.data if streams.heartrate else []
+    cadences = streams.cadence.data if streams.cadence else []
+
+    gpx = etree.Element(
+        f"{{{GPX_NS}}}gpx",
+        nsmap={None: GPX_NS, "gpxtpx": TPE_NS, "xsi": XSI_NS},
+    )
+    gpx.set(f"{{{XSI_NS}}}schemaLocation", f"{GPX_NS} {GPX_NS}/gpx.xsd")
+    gpx.set("version", "1.1")
+    gpx.set("creator", "Strava NoShoes")
+
+    sub = etree.SubElement
+    metadata = sub(gpx, f"{{{GPX_NS}}}metadata")
+    sub(metadata, f"{{{GPX_NS}}}name").text = name
+    sub(metadata, f"{{{GPX_NS}}}desc").text = f"Strava Activity {activity_id}"
+    segment = sub(sub(gpx, f"{{{GPX_NS}}}trk"), f"{{{GPX_NS}}}trkseg")
+
+    trkpt_tag, ele_tag, time_tag = (f"{{{GPX_NS}}}{t}" for t in ("trkpt", "ele", "time"))
+    extensions_tag = f"{{{GPX_NS}}}extensions"
+    tpx_tag, hr_tag, cad_tag = (
+        f"{{{TPE_NS}}}{t}" for t in ("TrackPointExtension", "hr", "cad")
+    )
+
+    # Timestamps are computed up front and the optional streams are padded with
+    # None, so the per-point loop needs no index or length checks.
+    n = len(latlngs)
+    point_times = [
+        _format_gpx_time(start_time + timedelta(seconds=seconds)) for seconds in times[:n]
+    ]
+    for (lat, lon), ele, point_time, hr, cad in zip_longest(
+        latlngs, altitudes[:n], point_times, heartrates[:n], cadences[:n]
+    ):
+        point = sub(segment, trkpt_tag, lat=str(lat), lon=str(lon))
+        if ele is not None:
+            sub(point, ele_tag).text = str(ele)
+        if point_time is not None:
+            sub(point, time_tag).text = point_time
+        if hr is not None or cad is not None:
+            tpx = sub(sub(point, extensions_tag), tpx_tag)
+            if hr is not None:
+                sub(tpx, hr_tag).text = str(hr)
+            if cad is not None:
+                sub(tpx, cad_tag).text = str(cad)
+
+    return etree.tostring(gpx, xml_declaration=True, encoding="UTF-8", pretty_print=True)
+
+
+def _is_reusable_get(endpoint: str, params: Optional[Dict[str, Any]]) -> bool:
+    """Whether a GET is likely to be repeated with the same URL and parameters.
+
+    Detail lookups (athlete, gear, activity) are. Of the activity list only the
+    undated first page is: ``after``/``before`` bounds move with the clock, and
+    later pages are only walked during full-history scans.
+    """
+    if endpoint != "/athlete/activities":
+        return True
+    params = params or {}
+    if any(name in params for name in _TRANSIENT_LIST_PARAMS):
+        return False
+    return params.get("page", 1) == 1
+
+
+def _write_atomically(file_path: str, data: bytes) -> None:
+    """Write beside the target and rename so readers never see a partial file."""
+    Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, file_path)
 
 
 class StravaAPIError(Exception):
@@ -26,7 +183,7 @@ class StravaAPIError(Exception):
 class StravaService:
     """Service class for interacting with Strava API."""
     
-    def __init__(self):
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
         self.base_url = settings.strava_api_base_url
         self.client_id = settings.strava_client_id
         self.client_secret = settings.strava_client_secret
@@ -44,14 +201,41 @@ class StravaService:
         # Try to load from token file
         self._load_tokens()
         
-        self._gear_cache: Dict[str, str] = {}
-        
+        self._gear_cache: Dict[str, str] = _GEAR_NAME_CACHES.setdefault(refresh_lock_key, {})
+        self._recent_activities: "OrderedDict[int, Activity]" = OrderedDict()
+        # (url, params) -> (ETag, body) of GET responses Strava tagged
+        self._etag_cache: "OrderedDict[Tuple[str, Tuple[Any, ...]], Tuple[str, bytes]]" = OrderedDict()
+
+        self._headers: Optional[Dict[str, str]] = None
+        self._headers_token: Optional[str] = None
+
+        # Shared keep-alive pool; created lazily when none is injected.
+        self.http_client = http_client
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Return the pooled HTTP client, creating it on first use."""
+        if self.http_client is None:
+            self.http_client = create_http_client()
+        return self.http_client
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client."""
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+
+    async def __aenter__(self) -> "StravaService":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
     def _load_tokens(self) -> None:
         """Load tokens from local file if it exists."""
         if os.path.exists(self.token_file):
             try:
-                with open(self.token_file, "r") as f:
-                    data = json.load(f)
+                with open(self.token_file, "rb") as f:
+                    data = orjson.loads(f.read())
                     token_client_id = data.get("client_id")
                     if (
                         token_client_id is not None
@@ -68,17 +252,17 @@ class StravaService:
             except Exception as e:
                 print(f"Error loading tokens from {self.token_file}: {e}")
 
-    def _save_tokens(self) -> None:
-        """Save current tokens to local file."""
-        os.makedirs(os.path.dirname(self.token_file), exist_ok=True)
+    async def _save_tokens(self) -> None:
+        """Save current tokens to local file without blocking the event loop."""
+        data = orjson.dumps({
+            "client_id": self.client_id,
+            "access_token": self.access_token,
+            "refresh_token": self.refresh_token,
+            "expires_at": self.expires_at
+        }, option=orjson.OPT_INDENT_2)
         try:
-            with open(self.token_file, "w") as f:
-                json.dump({
-                    "client_id": self.client_id,
-                    "access_token": self.access_token,
-                    "refresh_token": self.refresh_token,
-                    "expires_at": self.expires_at
-                }, f, indent=4)
+            # Atomic replace: a crash mid-write never leaves a torn token file
+            await asyncio.to_thread(_write_atomically, self.token_file, data)
         except Exception as e:
             print(f"Error saving tokens to {self.token_file}: {e}")
 
@@ -96,10 +280,14 @@ class StravaService:
         if not self.access_token:
             raise StravaAPIError("Access token not available. Please authenticate first.")
         
-        return {
-            "Authorization": f"Bearer {self.access_token}",
-            "Content-Type": "application/json"
-        }
+        # Reuse one dict per token; a refresh changes the token and rebuilds it.
+        if self._headers is None or self._headers_token != self.access_token:
+            self._headers = {
+                "Authorization": f"Bearer {self.access_token}",
+                "Content-Type": "application/json"
+            }
+            self._headers_token = self.access_token
+        return self._headers
     
     async def _make_request(
         self, 
@@ -109,63 +297,98 @@ class StravaService:
         json_data: Optional[Dict[str, Any]] = None
     ) -> Any:
         """Make an authenticated request to Strava API."""
+        return orjson.loads(await self._make_request_raw(method, endpoint, params, json_data))
+
+    async def _make_request_raw(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        json_data: Optional[Dict[str, Any]] = None,
+        cache: bool = True
+    ) -> bytes:
+        """Make an authenticated request and return the undecoded JSON body.
+
+        ``cache=False`` keeps a GET out of the ETag cache, for large bodies
+        that are not requested again; list pages that are unlikely to repeat
+        are skipped as well (see ``_is_reusable_get``).
+        """
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
         headers = await self._get_headers()
-        
-        async with httpx.AsyncClient() as client:
-            try:
+        client = self._get_http_client()
+
+        # Revalidate GETs Strava tagged before; a 304 reuses the stored body.
+        cache_key = cached = None
+        if method == "GET" and cache and _is_reusable_get(endpoint, params):
+            cache_key = (url, tuple(sorted((params or {}).items())))
+            cached = self._etag_cache.get(cache_key)
+            if cached:
+                headers = {**headers, "If-None-Match": cached[0]}
+
+        try:
+            for attempt in range(RATE_LIMIT_RETRIES + 1):
                 response = await client.request(
                     method=method,
                     url=url,
                     headers=headers,
                     params=params,
                     json=json_data,
-                    timeout=30.0
                 )
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                if e.response.status_code == 401:
-                    # Force one refresh and retry. Any second HTTP error is
-                    # converted to StravaAPIError instead of leaking a traceback.
-                    failed_access_token = headers["Authorization"].removeprefix(
-                        "Bearer "
-                    )
-                    await self._refresh_access_token(
-                        failed_access_token=failed_access_token
-                    )
-                    headers = await self._get_headers()
-                    retry_response = await client.request(
-                        method=method,
-                        url=url,
-                        headers=headers,
-                        params=params,
-                        json=json_data,
-                        timeout=30.0
-                    )
-                    try:
-                        retry_response.raise_for_status()
-                    except httpx.HTTPStatusError as retry_error:
-                        status = retry_error.response.status_code
-                        if status == 401:
-                            raise StravaAPIError(
-                                "Strava rejected the refreshed access token (401). "
-                                "Authorize this container separately and verify that "
-                                "CLIENT_ID, CLIENT_SECRET and REFRESH_TOKEN belong to "
-                                "the same Strava application and athlete."
-                            ) from retry_error
+                if response.status_code != 429 or attempt == RATE_LIMIT_RETRIES:
+                    break
+                await asyncio.sleep(RATE_LIMIT_BACKOFF * 2 ** attempt)
+            if response.status_code == 304 and cached:
+                self._etag_cache.move_to_end(cache_key)
+                return cached[1]
+            response.raise_for_status()
+            etag = response.headers.get("etag")
+            if cache_key and etag:
+                self._etag_cache[cache_key] = (etag, response.content)
+                self._etag_cache.move_to_end(cache_key)
+                if len(self._etag_cache) > ETAG_CACHE_SIZE:
+                    self._etag_cache.popitem(last=False)
+            return response.content
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 401:
+                # Force one refresh and retry. Any second HTTP error is
+                # converted to StravaAPIError instead of leaking a traceback.
+                failed_access_token = headers["Authorization"].removeprefix(
+                    "Bearer "
+                )
+                await self._refresh_access_token(
+                    failed_access_token=failed_access_token
+                )
+                headers = await self._get_headers()
+                retry_response = await client.request(
+                    method=method,
+                    url=url,
+                    headers=headers,
+                    params=params,
+                    json=json_data,
+                )
+                try:
+                    retry_response.raise_for_status()
+                except httpx.HTTPStatusError as retry_error:
+                    status = retry_error.response.status_code
+                    if status == 401:
                         raise StravaAPIError(
-                            f"Strava API request failed after token refresh (HTTP {status}): "
-                            f"{self._response_error_detail(retry_error.response)}"
+                            "Strava rejected the refreshed access token (401). "
+                            "Authorize this container separately and verify that "
+                            "CLIENT_ID, CLIENT_SECRET and REFRESH_TOKEN belong to "
+                            "the same Strava application and athlete."
                         ) from retry_error
-                    return retry_response.json()
-                else:
                     raise StravaAPIError(
-                        f"Strava API request failed (HTTP {e.response.status_code}): "
-                        f"{self._response_error_detail(e.response)}"
-                    ) from e
-            except httpx.RequestError as e:
-                raise StravaAPIError(f"Strava network error: {str(e)}") from e
+                        f"Strava API request failed after token refresh (HTTP {status}): "
+                        f"{self._response_error_detail(retry_error.response)}"
+                    ) from retry_error
+                return retry_response.content
+            else:
+                raise StravaAPIError(
+                    f"Strava API request failed (HTTP {e.response.status_code}): "
+                    f"{self._response_error_detail(e.response)}"
+                ) from e
+        except httpx.RequestError as e:
+            raise StravaAPIError(f"Strava network error: {str(e)}") from e
     
     async def _refresh_access_token(
         self, failed_access_token: Optional[str] = None
@@ -209,39 +432,40 @@ class StravaService:
                 "grant_type": "refresh_token",
             }
 
-            async with httpx.AsyncClient() as client:
-                try:
-                    response = await client.post(url, data=data)
-                    response.raise_for_status()
-                    token_data = response.json()
+            # Same host as the API, so the token call reuses the keep-alive pool.
+            client = self._get_http_client()
+            try:
+                response = await client.post(url, data=data)
+                response.raise_for_status()
+                token_data = orjson.loads(response.content)
 
-                    self.access_token = token_data["access_token"]
-                    self.refresh_token = token_data["refresh_token"]
-                    self.expires_at = token_data["expires_at"]
+                self.access_token = token_data["access_token"]
+                self.refresh_token = token_data["refresh_token"]
+                self.expires_at = token_data["expires_at"]
 
-                    # Update settings (syncing with settings object if needed)
-                    settings.strava_access_token = self.access_token
-                    settings.strava_refresh_token = self.refresh_token
-                    settings.strava_token_expires_at = self.expires_at
+                # Update settings (syncing with settings object if needed)
+                settings.strava_access_token = self.access_token
+                settings.strava_refresh_token = self.refresh_token
+                settings.strava_token_expires_at = self.expires_at
 
-                    # Persist to file so the other service instances reuse it.
-                    self._save_tokens()
+                # Persist to file so the other service instances reuse it.
+                await self._save_tokens()
 
-                except httpx.HTTPStatusError as exc:
-                    raise StravaAPIError(
-                        f"Strava token refresh failed (HTTP {exc.response.status_code}): "
-                        f"{self._response_error_detail(exc.response)}. Re-authorize this "
-                        "athlete for this Strava API application."
-                    ) from exc
-                except httpx.RequestError as exc:
-                    raise StravaAPIError(
-                        f"Strava token refresh network error: {str(exc)}"
-                    ) from exc
-                except (KeyError, ValueError) as exc:
-                    raise StravaAPIError(
-                        "Strava token response is missing required fields. Re-authorize "
-                        "this athlete."
-                    ) from exc
+            except httpx.HTTPStatusError as exc:
+                raise StravaAPIError(
+                    f"Strava token refresh failed (HTTP {exc.response.status_code}): "
+                    f"{self._response_error_detail(exc.response)}. Re-authorize this "
+                    "athlete for this Strava API application."
+                ) from exc
+            except httpx.RequestError as exc:
+                raise StravaAPIError(
+                    f"Strava token refresh network error: {str(exc)}"
+                ) from exc
+            except (KeyError, ValueError) as exc:
+                raise StravaAPIError(
+                    "Strava token response is missing required fields. Re-authorize "
+                    "this athlete."
+                ) from exc
 
     @staticmethod
     def _response_error_detail(response: httpx.Response) -> str:
@@ -288,70 +512,165 @@ class StravaService:
         
         print(f"DEBUG: get_activities params: {params} | filter: {activity_filter}")
         
-        all_activities_data = []
-        
         if all_pages:
-            params["per_page"] = 200  # Maximize items per page for efficiency
-            current_page = 1
-            while True:
-                params["page"] = current_page
-                data = await self._make_request("GET", "/athlete/activities", params=params)
-                if not data:
-                    break
-                all_activities_data.extend(data)
-                if len(data) < 200:
-                    break
-                current_page += 1
+            all_activities_data = await self._fetch_all_pages(params)
         else:
             data = await self._make_request("GET", "/athlete/activities", params=params)
             all_activities_data = data
             
-        activities = [
-            Activity(source="strava", **activity_data)
-            for activity_data in all_activities_data
-        ]
+        activities = _parse_activities(all_activities_data)
+        self._remember_activities(activities)
         
         # Populate gear names using the new method
         if activities:
             await self._populate_gear_names_for_activities(activities)
 
+        # Always sort by date descending (newest first)
+        # Strava API returns ascending if 'after' is used, so we force consistency
+        activities.sort(key=attrgetter("start_ts"), reverse=True)
+
         # Apply additional filters
         if activity_filter:
-            if activity_filter.activity_type:
-                activities = [a for a in activities if a.sport_type == activity_filter.activity_type]
-            
-            if activity_filter.has_gear is not None:
-                if activity_filter.has_gear:
-                    activities = [a for a in activities if a.gear_id is not None]
-                else:
-                    activities = [a for a in activities if a.gear_id is None]
-            
-            if activity_filter.gear_id:
-                activities = [a for a in activities if a.gear_id == activity_filter.gear_id]
-
-            # Explicitly filter by date (client-side backup)
+            # Explicitly filter by date (client-side backup). The list is sorted
+            # newest first, so the cut is a binary search instead of a scan;
+            # timestamps compare naive and aware datetimes alike.
             if activity_filter.after:
-                # Ensure we compare timezone-aware datetimes if possible
-                if activity_filter.after.tzinfo is None and activities and activities[0].start_date.tzinfo:
-                    # Make filter aware (assume UTC/local match or just naive compare)
-                    # Simplest: use timestamp comparison
-                    cutoff = activity_filter.after.timestamp()
-                    activities = [a for a in activities if a.start_date.timestamp() > cutoff]
-                else:
-                    activities = [a for a in activities if a.start_date > activity_filter.after]
-        
-        # Always sort by date descending (newest first)
-        
-        # Always sort by date descending (newest first)
-        # Strava API returns ascending if 'after' is used, so we force consistency
-        activities.sort(key=lambda x: x.start_date, reverse=True)
+                cutoff = activity_filter.after.timestamp()
+                del activities[bisect_left(activities, -cutoff, key=lambda a: -a.start_ts):]
+
+            if activity_filter.has_client_side_filters:
+                keep = self._filter_predicate(activity_filter)
+                activities = [a for a in activities if keep(a)]
         
         return activities
     
+    async def get_activity_summaries(
+        self, activity_filter: Optional[ActivityFilter] = None
+    ) -> List[ActivitySummary]:
+        """Get every matching activity as a lightweight summary for statistics.
+
+        Unlike ``get_activities`` this skips full model validation and gear
+        name lookups, which statistics never read.
+        """
+        params: Dict[str, Any] = {}
+        if activity_filter and activity_filter.before:
+            params["before"] = int(activity_filter.before.timestamp())
+        if activity_filter and activity_filter.after:
+            params["after"] = int(activity_filter.after.timestamp())
+
+        summaries = _ACTIVITY_SUMMARIES.validate_python(await self._fetch_all_pages(params))
+
+        if activity_filter and activity_filter.after:
+            cutoff = activity_filter.after.timestamp()
+            summaries = [a for a in summaries if a.start_ts > cutoff]
+        return summaries
+
+    async def get_activities_before(
+        self, activity_filter: ActivityFilter, limit: int
+    ) -> List[Activity]:
+        """Return up to ``limit`` matching activities, newest first.
+
+        Walks back from ``activity_filter.before`` (Strava returns newest first
+        when only ``before`` is sent) and stops at ``activity_filter.after``, so
+        a cursor page costs O(limit) instead of fetching the whole history.
+        """
+        page_size = STRAVA_MAX_PER_PAGE if activity_filter.has_client_side_filters else limit
+        params: Dict[str, Any] = {"per_page": page_size}
+        if activity_filter.before:
+            params["before"] = int(activity_filter.before.timestamp())
+        after_ts = activity_filter.after.timestamp() if activity_filter.after else None
+        keep = self._filter_predicate(activity_filter)
+
+        matches: List[Activity] = []
+        page = 1
+        while len(matches) < limit:
+            params["page"] = page
+            data = await self._make_request("GET", "/athlete/activities", params=params)
+            reached_after = False
+            for activity in _parse_activities(data):
+                if after_ts is not None and activity.start_ts <= after_ts:
+                    reached_after = True
+                    break
+                if keep(activity):
+                    matches.append(activity)
+            if reached_after or len(data) < page_size:
+                break
+            page += 1
+
+        matches = matches[:limit]
+        self._remember_activities(matches)
+        if matches:
+            await self._populate_gear_names_for_activities(matches)
+        return matches
+
+    @staticmethod
+    def _filter_predicate(activity_filter: ActivityFilter) -> Callable[[Activity], bool]:
+        """Build a check for the activity type and gear filters Strava cannot apply itself.
+
+        The filter fields are read once here so the per-activity check only
+        compares locals.
+        """
+        activity_type = activity_filter.activity_type
+        has_gear = activity_filter.has_gear
+        gear_id = activity_filter.gear_id
+
+        def keep(activity: Activity) -> bool:
+            if activity_type and activity.sport_type != activity_type:
+                return False
+            if has_gear is not None and has_gear != (activity.gear_id is not None):
+                return False
+            if gear_id and activity.gear_id != gear_id:
+                return False
+            return True
+
+        return keep
+
+    async def _fetch_all_pages(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Fetch every activity page, requesting follow-up pages concurrently.
+
+        The first page is fetched alone so short histories cost one request.
+        After that the window of parallel requests doubles up to
+        PAGE_FETCH_CONCURRENCY and stops at the first short page.
+        """
+        params = {**params, "per_page": STRAVA_MAX_PER_PAGE}
+
+        async def fetch_page(page: int) -> List[Dict[str, Any]]:
+            return await self._make_request(
+                "GET", "/athlete/activities", params={**params, "page": page}
+            )
+
+        activities_data: List[Dict[str, Any]] = []
+        next_page = 1
+        window = 1
+        while True:
+            pages = range(next_page, next_page + window)
+            results = await asyncio.gather(
+                *(fetch_page(page) for page in pages), return_exceptions=True
+            )
+            for data in results:
+                if isinstance(data, BaseException):
+                    raise data
+            for data in results:
+                activities_data.extend(data)
+                if len(data) < STRAVA_MAX_PER_PAGE:
+                    return activities_data
+            next_page += window
+            window = min(window * 2, PAGE_FETCH_CONCURRENCY)
+
     async def get_activity_by_id(self, activity_id: int) -> Activity:
         """Get detailed information about a specific activity."""
         data = await self._make_request("GET", f"/activities/{activity_id}")
-        return Activity(source="strava", **data)
+        activity = Activity(source="strava", **data)
+        self._remember_activities([activity])
+        return activity
+
+    def _remember_activities(self, activities: Iterable[Activity]) -> None:
+        """Remember activities by id, evicting the least recently seen ones."""
+        for activity in activities:
+            self._recent_activities[activity.id] = activity
+            self._recent_activities.move_to_end(activity.id)
+        while len(self._recent_activities) > ACTIVITY_CACHE_SIZE:
+            self._recent_activities.popitem(last=False)
     
     async def get_gear_by_id(self, gear_id: str) -> Optional[Gear]:
         """Get detailed gear information by ID."""
@@ -380,14 +699,7 @@ class StravaService:
             
             print(f"Found {len(gear_ids)} unique gear IDs from activities")
             
-            # Fetch details for each gear
-            gear_list = []
-            for gear_id in gear_ids:
-                gear = await self.get_gear_by_id(gear_id)
-                if gear:
-                    gear_list.append(gear)
-                    self._gear_cache[gear.id] = gear.name
-                    print(f"Cached gear: {gear.id} -> {gear.name}")
+            gear_list = await self._fetch_gear(gear_ids)
             
             print(f"Total gear cached: {len(self._gear_cache)} items")
             return gear_list
@@ -398,6 +710,21 @@ class StravaService:
             traceback.print_exc()
             return []
 
+    async def _fetch_gear(self, gear_ids: Iterable[str]) -> List[Gear]:
+        """Fetch gear details concurrently and cache their names."""
+        semaphore = asyncio.Semaphore(GEAR_FETCH_CONCURRENCY)
+
+        async def fetch(gear_id: str) -> Optional[Gear]:
+            async with semaphore:
+                return await self.get_gear_by_id(gear_id)
+
+        results = await asyncio.gather(*(fetch(gear_id) for gear_id in gear_ids))
+        gear_list = [gear for gear in results if gear]
+        for gear in gear_list:
+            self._gear_cache[gear.id] = gear.name
+            print(f"Cached gear: {gear.id} -> {gear.name}")
+        return gear_list
+
     async def _get_gear_map(self) -> Dict[str, str]:
         """Get mapping of gear ID to name, using cache if available."""
         if not self._gear_cache:
@@ -409,27 +736,21 @@ class StravaService:
     
     async def _populate_gear_names_for_activities(self, activities: List[Activity]) -> None:
         """Populate gear names for activities by fetching missing gear details."""
-        # Collect gear IDs that need names
-        missing_gear_ids = set()
-        for activity in activities:
-            if activity.gear_id and activity.gear_id not in self._gear_cache:
-                missing_gear_ids.add(activity.gear_id)
+        gear_cache = self._gear_cache
+        missing_gear_ids = {
+            a.gear_id for a in activities if a.gear_id and a.gear_id not in gear_cache
+        }
         
         # Fetch missing gear details
         if missing_gear_ids:
             print(f"Fetching details for {len(missing_gear_ids)} gear items...")
-            for gear_id in missing_gear_ids:
-                gear = await self.get_gear_by_id(gear_id)
-                if gear:
-                    self._gear_cache[gear.id] = gear.name
-                    print(f"Cached gear: {gear.id} -> {gear.name}")
+            await self._fetch_gear(missing_gear_ids)
         
-        # Apply gear names to activities
+        # Apply gear names; activities without gear (or unknown gear) get None
         for activity in activities:
-            if activity.gear_id and activity.gear_id in self._gear_cache:
-                activity.gear_name = self._gear_cache[activity.gear_id]
+            activity.gear_name = gear_cache.get(activity.gear_id)
     
-    async def get_activity_streams(self, activity_id: int) -> Dict[str, Any]:
+    async def get_activity_streams(self, activity_id: int) -> ActivityStreams:
         """Get activity streams for GPX generation."""
         keys = ["latlng", "altitude", "time", "heartrate", "cadence", "temp"]
         endpoint = f"/activities/{activity_id}/streams"
@@ -437,129 +758,95 @@ class StravaService:
             "keys": ",".join(keys),
             "key_by_type": "true"
         }
-        return await self._make_request("GET", endpoint, params=params)
+        # Validate straight from the response bytes; long activities carry
+        # several arrays of thousands of samples. Streams stay out of the ETag
+        # cache: they run to megabytes and the GPX built from them is on disk.
+        raw = await self._make_request_raw("GET", endpoint, params=params, cache=False)
+        return ActivityStreams.model_validate_json(raw)
     
-    async def download_gpx(self, activity_id: int, save_path: Optional[str] = None, activity_name: Optional[str] = None) -> str:
-        """Download GPX file by fetching streams and manually constructing the GPX file."""
-        if not save_path:
-            save_path = settings.gpx_storage_path
-        
-        # Create directory if it doesn't exist
-        Path(save_path).mkdir(parents=True, exist_ok=True)
-        
-        # Get activity details
-        activity = await self.get_activity_by_id(activity_id)
-        if not activity_name:
-            activity_name = activity.name
-        
-        # Check if file already exists (caching)
-        safe_name = activity_name.replace(' ', '_').replace('/', '_').replace('\\', '_')
-        filename = f"{safe_name}.gpx"
-        file_path = os.path.join(save_path, filename)
-        
-        if os.path.exists(file_path):
+    def gpx_path_for(self, activity_id: int, save_path: Optional[str] = None) -> str:
+        """Return where the GPX file for an activity is stored."""
+        return os.path.join(save_path or settings.gpx_storage_path, f"{activity_id}.gpx")
+
+    def stored_gpx_path(self, activity_id: int, save_path: Optional[str] = None) -> Optional[str]:
+        """Return the stored GPX path for an activity, or None if it is not built yet."""
+        file_path = self.gpx_path_for(activity_id, save_path)
+        if os.path.isfile(file_path) and os.path.getsize(file_path) > 0:
+            return file_path
+        return None
+
+    async def download_gpx(
+        self,
+        activity_id: int,
+        save_path: Optional[str] = None,
+        activity_name: Optional[str] = None,
+        activity: Optional[Activity] = None,
+    ) -> str:
+        """Download GPX file by fetching streams and manually constructing the GPX file.
+
+        Pass ``activity`` when the caller already fetched it to skip a second lookup.
+        """
+        file_path = self.gpx_path_for(activity_id, save_path)
+        if self.stored_gpx_path(activity_id, save_path):
             # File already downloaded, return cached version
             return file_path
+        # Concurrent requests for the same file share a single build.
+        return await run_once(
+            ("gpx", file_path),
+            lambda: self._build_gpx(activity_id, file_path, activity_name, activity),
+        )
+
+    async def _build_gpx(
+        self,
+        activity_id: int,
+        file_path: str,
+        activity_name: Optional[str],
+        activity: Optional[Activity] = None,
+    ) -> str:
+        """Build a GPX file from the activity streams and write it to file_path."""
+        # Get activity details; a recent list or lookup already has name and start date
+        if activity is None:
+            activity = self._recent_activities.get(activity_id)
+        if activity is None:
+            activity = await self.get_activity_by_id(activity_id)
+        if not activity_name:
+            activity_name = activity.name
         
         # Fetch streams
         streams = await self.get_activity_streams(activity_id)
         
-        if "latlng" not in streams:
+        if streams.latlng is None:
             raise StravaAPIError(f"No GPS data (latlng stream) available for activity {activity_id}")
         
-        # Construct GPX
-        gpx = gpxpy.gpx.GPX()
-        gpx.name = activity_name
-        gpx.description = f"Strava Activity {activity_id}"
-        
-        # Create track
-        gpx_track = gpxpy.gpx.GPXTrack()
-        gpx.tracks.append(gpx_track)
-        
-        # Create segment
-        gpx_segment = gpxpy.gpx.GPXTrackSegment()
-        gpx_track.segments.append(gpx_segment)
-        
-        # Get stream data
-        latlngs = streams["latlng"]["data"]
-        times = streams.get("time", {}).get("data", [])
-        altitudes = streams.get("altitude", {}).get("data", [])
-        heartrates = streams.get("heartrate", {}).get("data", [])
-        cadences = streams.get("cadence", {}).get("data", [])
-        
-        start_time = activity.start_date  # This is a datetime object
-        
-        for i in range(len(latlngs)):
-            lat, lon = latlngs[i]
-            
-            # Calculate timestamp
-            point_time = None
-            if i < len(times):
-                from datetime import timedelta
-                point_time = start_time + timedelta(seconds=times[i])
-            
-            elevation = altitudes[i] if i < len(altitudes) else None
-            
-            point = gpxpy.gpx.GPXTrackPoint(
-                latitude=lat,
-                longitude=lon,
-                elevation=elevation,
-                time=point_time
-            )
-            
-            # Add extensions for heartrate and cadence
-            if i < len(heartrates) or i < len(cadences):
-                from lxml import etree
-                TPE_NS = 'http://www.garmin.com/xmlschemas/TrackPointExtension/v1'
-                tpx = etree.Element(f'{{{TPE_NS}}}TrackPointExtension')
-                
-                if i < len(heartrates):
-                    hr = etree.SubElement(tpx, f'{{{TPE_NS}}}hr')
-                    hr.text = str(heartrates[i])
-                
-                if i < len(cadences):
-                    cad = etree.SubElement(tpx, f'{{{TPE_NS}}}cad')
-                    cad.text = str(cadences[i])
-                
-                point.extensions.append(tpx)
-            
-            gpx_segment.points.append(point)
-        
-        # Save GPX file with structural fixes
-        gpx_xml = gpx.to_xml()
-        
-        # Precise string replacement to fix Garmin extensions and namespaces
-        TPE_NS = 'http://www.garmin.com/xmlschemas/TrackPointExtension/v1'
-        gpx_xml = gpx_xml.replace(f'<{TPE_NS}:TrackPointExtension>', '<gpxtpx:TrackPointExtension>')
-        gpx_xml = gpx_xml.replace(f'</{TPE_NS}:TrackPointExtension>', '</gpxtpx:TrackPointExtension>')
-        gpx_xml = gpx_xml.replace(f'<{TPE_NS}:hr>', '<gpxtpx:hr>')
-        gpx_xml = gpx_xml.replace(f'</{TPE_NS}:hr>', '</gpxtpx:hr>')
-        gpx_xml = gpx_xml.replace(f'<{TPE_NS}:cad>', '<gpxtpx:cad>')
-        gpx_xml = gpx_xml.replace(f'</{TPE_NS}:cad>', '</gpxtpx:cad>')
-        
-        if 'xmlns:gpxtpx' not in gpx_xml:
-            gpx_xml = gpx_xml.replace('<gpx ', f'<gpx xmlns:gpxtpx="{TPE_NS}" ')
-            
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(gpx_xml)
-        
+        # Rendering is CPU-bound for long activities; keep it off the event loop.
+        gpx_xml = await asyncio.to_thread(
+            _render_gpx, activity_id, activity_name, activity.start_date, streams
+        )
+
+        await asyncio.to_thread(_write_atomically, file_path, gpx_xml)
         return file_path
     
-    async def get_activities_without_gear(self, after: Optional[datetime] = None) -> List[Activity]:
-        """Get all activities that don't have gear assigned, optionally after a specific date."""
+    async def get_activities_without_gear(
+        self, after: Optional[datetime] = None, lookback_days: Optional[int] = None
+    ) -> List[Activity]:
+        """Get all activities that don't have gear assigned, optionally after a specific date.
+
+        Without ``after`` only the last ``lookback_days`` are scanned (default
+        ``settings.strava_no_gear_lookback_days``); 0 scans the whole history.
+        """
+        if after is None:
+            if lookback_days is None:
+                lookback_days = settings.strava_no_gear_lookback_days
+            if lookback_days:
+                after = datetime.now(timezone.utc) - timedelta(days=lookback_days)
         activity_filter = ActivityFilter(has_gear=False, after=after)
         return await self.get_activities(activity_filter, all_pages=True)
     
     async def get_running_activities(self, limit: Optional[int] = None) -> List[Activity]:
         """Get running activities specifically."""
-        if limit and limit <= 200:
-            activity_filter = ActivityFilter(activity_type="Run", per_page=limit)
-            return await self.get_activities(activity_filter)
-        
         activity_filter = ActivityFilter(activity_type="Run")
-        activities = await self.get_activities(activity_filter, all_pages=True)
-        
-        if limit and len(activities) > limit:
-            return activities[:limit]
-        
-        return activities
+        if limit:
+            # Strava cannot filter by type; walk back only until enough runs are found.
+            return await self.get_activities_before(activity_filter, limit)
+
+        return await self.get_activities(activity_filter, all_pages=True)
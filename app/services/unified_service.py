@@ -22,6 +22,7 @@ from app.models.database import (
 )
 from app.models.strava import Activity, Gear, ActivityFilter
 from app.services.garmin_service import GarminService, GarminAPIError
+from app.utils.file_utils import safe_filename
 
 import gpxpy
 import gpxpy.gpx
@@ -295,7 +296,7 @@ class UnifiedActivityService:
     async def _gpx_from_streams(self, db_activity: ActivityDB, save_path: str, activity_name: Optional[str]) -> str:
         """Generate GPX file from stored stream data in SQLite."""
         name = activity_name or db_activity.name
-        safe_name = name.replace(' ', '_').replace('/', '_').replace('\\', '_')
+        safe_name = safe_filename(name)
         filename = f"{safe_name}.gpx"
         file_path = os.path.join(save_path, filename)
 
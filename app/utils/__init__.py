@@ -1,6 +1,6 @@
 """Utility modules for the application."""
 
 from .auth import StravaAuthHelper
-from .file_utils import FileManager
+from .file_utils import FileManager, safe_filename
 
-__all__ = ["StravaAuthHelper", "FileManager"]
\ No newline at end of file
+__all__ = ["StravaAuthHelper", "FileManager", "safe_filename"]
\ No newline at end of file
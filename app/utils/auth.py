@@ -2,17 +2,32 @@
 
 import httpx
 from typing import Optional, Dict, Any
+from urllib.parse import urlencode
 from app.config import settings
 
 
 class StravaAuthHelper:
     """Helper class for Strava OAuth authentication flow."""
     
-    def __init__(self):
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
         self.client_id = settings.strava_client_id
         self.client_secret = settings.strava_client_secret
         self.redirect_uri = "http://localhost:8000/auth/callback"
         self.scope = "read,activity:read_all"
+        # Keep-alive client shared by the OAuth calls; created lazily when none is injected.
+        self.http_client = http_client
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Return the shared HTTP client, creating it on first use."""
+        if self.http_client is None:
+            self.http_client = httpx.AsyncClient()
+        return self.http_client
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP client."""
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
     
     def get_authorization_url(self, state: Optional[str] = None) -> str:
         """Generate Strava OAuth authorization URL."""
@@ -28,8 +43,7 @@ class StravaAuthHelper:
         if state:
             params["state"] = state
         
-        query_string = "&".join([f"{k}={v}" for k, v in params.items()])
-        return f"{base_url}?{query_string}"
+        return f"{base_url}?{urlencode(params)}"
     
     async def exchange_code_for_token(self, code: str) -> Dict[str, Any]:
         """Exchange authorization code for access token."""
@@ -41,10 +55,9 @@ class StravaAuthHelper:
             "grant_type": "authorization_code"
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, data=data)
-            response.raise_for_status()
-            return response.json()
+        response = await self._get_http_client().post(url, data=data)
+        response.raise_for_status()
+        return response.json()
     
     async def refresh_token(self, refresh_token: str) -> Dict[str, Any]:
         """Refresh access token using refresh token."""
@@ -56,20 +69,18 @@ class StravaAuthHelper:
             "grant_type": "refresh_token"
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, data=data)
-            response.raise_for_status()
-            return response.json()
+        response = await self._get_http_client().post(url, data=data)
+        response.raise_for_status()
+        return response.json()
     
     async def deauthorize(self, access_token: str) -> bool:
         """Deauthorize the application."""
         url = "https://www.strava.com/oauth/deauthorize"
         headers = {"Authorization": f"Bearer {access_token}"}
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(url, headers=headers)
-                response.raise_for_status()
-                return True
-            except httpx.HTTPStatusError:
-                return False
\ No newline at end of file
+        try:
+            response = await self._get_http_client().post(url, headers=headers)
+            response.raise_for_status()
+            return True
+        except httpx.HTTPStatusError:
+            return False
\ No newline at end of file
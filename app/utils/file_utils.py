@@ -1,11 +1,19 @@
 """File management utilities."""
 
+import asyncio
 import os
-import aiofiles
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterator, List, Optional
 from app.config import settings
 
+# Separators and characters Windows rejects in file names.
+_SAFE_FILENAME_TABLE = str.maketrans(dict.fromkeys(' /\\:*?"<>|', '_'))
+
+
+def safe_filename(name: str) -> str:
+    """Replace path separators and reserved characters in a file name with '_'."""
+    return name.translate(_SAFE_FILENAME_TABLE)
+
 
 class FileManager:
     """Utility class for file operations."""
@@ -17,28 +25,32 @@ class FileManager:
     async def save_gpx_file(self, content: bytes, filename: str) -> str:
         """Save GPX content to file."""
         file_path = self.gpx_storage_path / filename
-        
-        async with aiofiles.open(file_path, 'wb') as f:
-            await f.write(content)
-        
+        # GPX files are small; one thread hop for the whole write beats
+        # aiofiles dispatching each call to the pool.
+        await asyncio.to_thread(file_path.write_bytes, content)
         return str(file_path)
     
     async def read_gpx_file(self, filename: str) -> Optional[bytes]:
         """Read GPX file content."""
         file_path = self.gpx_storage_path / filename
-        
-        if not file_path.exists():
+        try:
+            return await asyncio.to_thread(file_path.read_bytes)
+        except FileNotFoundError:
             return None
-        
-        async with aiofiles.open(file_path, 'rb') as f:
-            return await f.read()
     
+    def _scan_gpx_files(self) -> Iterator[os.DirEntry]:
+        """Yield stored GPX files; each entry caches its own ``stat()`` result."""
+        with os.scandir(self.gpx_storage_path) as entries:
+            for entry in entries:
+                if entry.name.endswith(".gpx") and entry.is_file():
+                    yield entry
+
     def list_gpx_files(self) -> List[str]:
         """List all GPX files in storage."""
         if not self.gpx_storage_path.exists():
             return []
         
-        return [f.name for f in self.gpx_storage_path.glob("*.gpx")]
+        return [entry.name for entry in self._scan_gpx_files()]
     
     def delete_gpx_file(self, filename: str) -> bool:
         """Delete a GPX file."""
@@ -70,9 +82,9 @@ class FileManager:
         cutoff_time = current_time - (days * 24 * 60 * 60)
         deleted_count = 0
         
-        for file_path in self.gpx_storage_path.glob("*.gpx"):
-            if file_path.stat().st_mtime < cutoff_time:
-                file_path.unlink()
+        for entry in self._scan_gpx_files():
+            if entry.stat().st_mtime < cutoff_time:
+                os.unlink(entry.path)
                 deleted_count += 1
         
         return deleted_count
@@ -86,11 +98,14 @@ class FileManager:
                 "total_size_mb": 0.0
             }
         
-        files = list(self.gpx_storage_path.glob("*.gpx"))
-        total_size = sum(f.stat().st_size for f in files)
+        total_files = 0
+        total_size = 0
+        for entry in self._scan_gpx_files():
+            total_files += 1
+            total_size += entry.stat().st_size
         
         return {
-            "total_files": len(files),
+            "total_files": total_files,
             "total_size_bytes": total_size,
             "total_size_mb": round(total_size / (1024 * 1024), 2)
         }
\ No newline at end of file
@@ -61,14 +61,19 @@ def cleanup_all_gpx_files(storage_path: str) -> Dict[str, Any]:
     
     # Find all GPX files
     try:
-        gpx_files = list(storage_dir.glob('*.gpx'))
+        # scandir yields names without a stat per file; DirEntry caches the one stat below
+        with os.scandir(storage_dir) as entries:
+            gpx_files = [
+                entry for entry in entries
+                if entry.name.endswith('.gpx') and entry.is_file()
+            ]
         logger.info(f"Found {len(gpx_files)} GPX file(s) to delete")
         
         # Delete each file
         for gpx_file in gpx_files:
             try:
                 file_size = gpx_file.stat().st_size
-                gpx_file.unlink()
+                os.unlink(gpx_file.path)
                 stats['files_deleted'] += 1
                 stats['space_freed'] += file_size
                 logger.debug(f"Deleted: {gpx_file.name} ({format_file_size(file_size)})")
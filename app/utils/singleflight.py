@@ -0,0 +1,37 @@
+"""Single-flight deduplication of concurrent identical async calls."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+_inflight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+
+
+async def run_once(key: Hashable, coro_factory: Callable[[], Awaitable[T]]) -> T:
+    """Run ``coro_factory()`` once for all concurrent callers sharing ``key``.
+
+    Callers arriving while a call for the same key is in flight await that
+    call's result (or exception) instead of starting their own. Results are
+    not kept once the call finishes; caching is left to the caller.
+
+    Args:
+        key: Hashable identity of the call, e.g. an endpoint plus its filter
+        coro_factory: Zero-argument callable returning the awaitable to run
+
+    Returns:
+        The shared result of the in-flight call
+    """
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(coro_factory())
+        _inflight[key] = task
+
+        def _forget(done: "asyncio.Task[Any]") -> None:
+            if _inflight.get(key) is done:
+                del _inflight[key]
+
+        task.add_done_callback(_forget)
+
+    # Shield so one cancelled caller does not cancel the call for the others.
+    return await asyncio.shield(task)
@@ -5,15 +5,23 @@ This script provides an easy way to run the application with different configura
 """
 
 import argparse
+import functools
 import sys
 import os
-from pathlib import Path
 
-# Add the app directory to Python path
-sys.path.insert(0, str(Path(__file__).parent))
+# Kept as a literal (matching app.__version__) so --version imports nothing
+__version__ = "0.1.0"
 
-def main():
+
+@functools.lru_cache(maxsize=None)
+def _build_parser():
+    """Build the command-line parser once per process."""
     parser = argparse.ArgumentParser(description="Run Strava NoShoes application")
+    parser.add_argument(
+        "--version",
+        action="version",
+        version=f"%(prog)s {__version__}"
+    )
     parser.add_argument(
         "--host", 
         default="0.0.0.0", 
@@ -42,41 +50,102 @@ def main():
         choices=["critical", "error", "warning", "info", "debug", "trace"],
         help="Log level (default: info)"
     )
+    parser.add_argument(
+        "--access-log",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Log every request (default: on, off with --workers > 1 or "
+             "--log-level warning and above)"
+    )
+    parser.add_argument(
+        "--assume-yes", "-y", "--no-prompt",
+        dest="assume_yes",
+        action="store_true",
+        help="Continue without asking when .env is missing "
+             "(or set STRAVA_NOSHOES_ASSUME_YES=1)"
+    )
+    return parser
+
+
+def main():
+    args = _build_parser().parse_args()
     
-    args = parser.parse_args()
+    # Filesystem work starts only once arguments are valid (not for --help)
+    # Add the app directory to Python path
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
     
-    # Check if .env file exists
-    if not Path(".env").exists():
-        print("⚠️  Warning: .env file not found!")
-        print("📝 Please copy .env.example to .env and configure your Strava API credentials.")
-        print("🔗 Get your credentials at: https://www.strava.com/settings/api")
-        print()
+    # Check if .env file exists, unless the environment already carries the credentials
+    if not os.environ.get("STRAVA_CLIENT_ID") and not os.path.exists(".env"):
+        sys.stdout.write(
+            "⚠️  Warning: .env file not found!\n"
+            "📝 Please copy .env.example to .env and configure your Strava API credentials.\n"
+            "🔗 Get your credentials at: https://www.strava.com/settings/api\n"
+            "\n"
+        )
+        sys.stdout.flush()
         
-        response = input("Continue anyway? (y/N): ").lower().strip()
-        if response not in ['y', 'yes']:
-            print("Exiting...")
-            sys.exit(1)
+        assume_yes = args.assume_yes or os.environ.get("STRAVA_NOSHOES_ASSUME_YES") == "1"
+        if not assume_yes:
+            if not sys.stdin.isatty():
+                print("Exiting... (pass --assume-yes to continue without a terminal)")
+                sys.exit(1)
+
+            response = input("Continue anyway? (y/N): ").lower().strip()
+            if response not in ['y', 'yes']:
+                print("Exiting...")
+                sys.exit(1)
     
-    # Create necessary directories
-    Path("data/gpx").mkdir(parents=True, exist_ok=True)
-    Path("logs").mkdir(exist_ok=True)
+    # Create necessary directories once; the marker skips this on later starts
+    if os.environ.get("STRAVA_SKIP_PROVISION") != "1" and not os.path.exists(".provisioned"):
+        os.makedirs("data/gpx", exist_ok=True)
+        os.makedirs("logs", exist_ok=True)
+        open(".provisioned", "a").close()
     
-    print("🏃‍♂️ Starting Strava NoShoes...")
-    print(f"🌐 Server will be available at: http://{args.host}:{args.port}")
-    print(f"📚 API Documentation: http://{args.host}:{args.port}/docs")
-    print(f"📖 ReDoc Documentation: http://{args.host}:{args.port}/redoc")
-    print()
+    base_url = f"http://{args.host}:{args.port}"
+    sys.stdout.write(
+        "🏃‍♂️ Starting Strava NoShoes...\n"
+        f"🌐 Server will be available at: {base_url}\n"
+        f"📚 API Documentation: {base_url}/docs\n"
+        f"📖 ReDoc Documentation: {base_url}/redoc\n"
+        "\n"
+    )
+    sys.stdout.flush()
     
     try:
         import uvicorn
+
+        # Only pass reload/workers when they differ from uvicorn's defaults
+        server_options = {}
+        if args.reload:
+            server_options["reload"] = True
+        elif args.workers != 1:
+            server_options["workers"] = args.workers
+
+        # Name the uvicorn[standard] loop and parser instead of letting uvicorn probe
+        try:
+            import uvloop  # noqa: F401
+            server_options["loop"] = "uvloop"
+        except ImportError:
+            server_options["loop"] = "auto"
+        try:
+            import httptools  # noqa: F401
+            server_options["http"] = "httptools"
+        except ImportError:
+            server_options["http"] = "auto"
+
+        access_log = args.access_log
+        if access_log is None:
+            multi_worker = args.workers > 1 and not args.reload
+            access_log = not multi_worker and args.log_level not in ("warning", "error", "critical")
+
         uvicorn.run(
             "app.main:app",
             host=args.host,
             port=args.port,
-            reload=args.reload,
-            workers=args.workers if not args.reload else 1,
             log_level=args.log_level,
-            access_log=True
+            access_log=access_log,
+            interface="asgi3",
+            **server_options
         )
     except ImportError:
         print("❌ Error: uvicorn not installed!")
@@ -0,0 +1,77 @@
+"""Shared pytest fixtures."""
+
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def app():
+    """The FastAPI application, imported only by tests that request it."""
+    from app.main import app
+
+    return app
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    """One TestClient for the whole session.
+
+    The client is not entered as a context manager: the lifespan would start
+    the Telegram bot whenever a developer's .env carries a real token.
+    """
+    from fastapi.testclient import TestClient
+
+    return TestClient(app)
+
+
+@pytest.fixture(scope="session")
+def health_client():
+    """TestClient for an app carrying only the health routes.
+
+    Building it does not import the Strava, forecast or bot services.
+    """
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.api.health import api_router, router
+
+    mini = FastAPI()
+    mini.include_router(router)
+    mini.include_router(api_router, prefix="/api/v1")
+    return TestClient(mini)
+
+
+@pytest.fixture
+def clear_response_cache():
+    """Empty the API response cache around a test."""
+    from app.api.cache import response_cache
+
+    response_cache.clear()
+    yield response_cache
+    response_cache.clear()
+
+
+@pytest.fixture(scope="session")
+def settings():
+    """Application settings, parsed from the environment once per session."""
+    from app.config import settings
+
+    return settings
+
+
+@pytest.fixture(scope="session")
+def app_modules(settings):
+    """The application objects the import smoke test checks, imported once."""
+    from app.models.strava import Activity, Athlete, Gear, StravaTokens
+    from app.services.strava_service import StravaService
+
+    return SimpleNamespace(
+        settings=settings,
+        Activity=Activity,
+        Athlete=Athlete,
+        Gear=Gear,
+        StravaTokens=StravaTokens,
+        StravaService=StravaService,
+    )
+
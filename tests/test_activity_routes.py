@@ -0,0 +1,211 @@
+"""Tests for the activity list endpoint and its pagination modes."""
+
+import base64
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.api import routes
+from app.api.routes import decode_cursor, encode_cursor
+from app.models.strava import ActivityFilter, ActivityStreams
+
+pytestmark = pytest.mark.usefixtures("clear_response_cache")
+
+NEWEST = datetime(2025, 6, 30, 8, 0, tzinfo=timezone.utc)
+
+
+def activity_payload(activity_id: int, start_date: datetime, **overrides) -> dict:
+    payload = {
+        "resource_state": 2,
+        "name": f"Run {activity_id}",
+        "distance": 10_000.0,
+        "moving_time": 3_000,
+        "elapsed_time": 3_100,
+        "total_elevation_gain": 50.0,
+        "type": "Run",
+        "sport_type": "Run",
+        "id": activity_id,
+        "start_date": start_date.isoformat(),
+        "start_date_local": start_date.isoformat(),
+        "timezone": "(GMT+00:00) UTC",
+        "utc_offset": 0.0,
+        "achievement_count": 0,
+        "kudos_count": 0,
+        "comment_count": 0,
+        "athlete_count": 1,
+        "photo_count": 0,
+        "trainer": False,
+        "commute": False,
+        "manual": False,
+        "private": False,
+        "visibility": "everyone",
+        "flagged": False,
+        "gear_id": None,
+        "average_speed": 3.3,
+        "max_speed": 4.0,
+        "has_heartrate": False,
+        "pr_count": 0,
+        "total_photo_count": 0,
+        "has_kudoed": False,
+    }
+    payload.update(overrides)
+    return payload
+
+
+@pytest.fixture
+def strava_history(monkeypatch):
+    """Serve 5 daily activities newest first, honouring before/page/per_page."""
+    history = [
+        activity_payload(i, NEWEST - timedelta(days=i), gear_id="g1" if i % 2 else None)
+        for i in range(5)
+    ]
+    requests = []
+
+    async def fake_make_request(method, endpoint, params=None, json_data=None):
+        requests.append(dict(params or {}))
+        items = history
+        if "before" in params:
+            items = [
+                item for item in items
+                if datetime.fromisoformat(item["start_date"]).timestamp() < params["before"]
+            ]
+        start = (params["page"] - 1) * params["per_page"]
+        return items[start:start + params["per_page"]]
+
+    monkeypatch.setattr(routes.service, "_make_request", fake_make_request)
+    monkeypatch.setattr(routes.service, "_gear_cache", {"g1": "Trail shoe"})
+    return requests
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(NEWEST)) == NEWEST
+    assert decode_cursor("") is None
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_cursor_pages_walk_back_through_history(client, strava_history):
+    first = client.get("/api/v1/activities?per_page=2&cursor=").json()
+    second = client.get(f"/api/v1/activities?per_page=2&cursor={first['next_cursor']}").json()
+    last = client.get(f"/api/v1/activities?per_page=2&cursor={second['next_cursor']}").json()
+
+    assert [item["id"] for item in first["items"]] == [0, 1]
+    assert [item["id"] for item in second["items"]] == [2, 3]
+    assert [item["id"] for item in last["items"]] == [4]
+    assert first["total"] is None
+    assert last["next_cursor"] is None
+    # Each cursor page is a single per_page-sized Strava request.
+    assert all(params["per_page"] == 2 for params in strava_history)
+
+
+def test_invalid_cursor_is_rejected(client, strava_history):
+    response = client.get("/api/v1/activities?cursor=not-a-cursor")
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("epoch", [b"99999999999999999999", b"-99999999999999999999"])
+def test_out_of_range_cursor_is_rejected(client, strava_history, epoch):
+    cursor = base64.urlsafe_b64encode(epoch).decode()
+
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+    response = client.get(f"/api/v1/activities?cursor={cursor}")
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_cursor_page_applies_client_side_filters(client, strava_history):
+    response = client.get("/api/v1/activities?per_page=2&has_gear=false&cursor=").json()
+
+    assert [item["id"] for item in response["items"]] == [0, 2]
+    assert strava_history[0]["per_page"] == 200
+
+
+def test_repeated_list_request_is_served_from_cache(client, strava_history):
+    first = client.get("/api/v1/activities?per_page=2")
+    requests_after_first = len(strava_history)
+    second = client.get("/api/v1/activities?per_page=2")
+
+    assert second.headers["X-Cache"] == "hit"
+    assert second.json() == first.json()
+    assert first.json()["items"][1]["gear_name"] == "Trail shoe"
+    assert len(strava_history) == requests_after_first
+
+
+def test_unfiltered_list_passes_page_through_to_strava(client, strava_history):
+    response = client.get("/api/v1/activities?page=2&per_page=2").json()
+
+    assert [item["id"] for item in response["items"]] == [2, 3]
+    assert response["total"] is None
+    assert response["next_cursor"] is not None
+    assert strava_history == [{"page": 2, "per_page": 2}]
+
+
+def test_filtered_list_keeps_totals(client, strava_history):
+    response = client.get("/api/v1/activities?per_page=2&has_gear=true").json()
+
+    assert [item["id"] for item in response["items"]] == [1, 3]
+    assert response["total"] == 2
+    assert response["total_pages"] == 1
+
+
+def test_after_bound_cuts_the_sorted_history(client, strava_history):
+    after = (NEWEST - timedelta(days=2, hours=12)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    response = client.get(f"/api/v1/activities?after={after}").json()
+
+    assert [item["id"] for item in response["items"]] == [0, 1, 2]
+    assert response["total"] == 3
+
+
+async def test_activity_page_is_parsed_into_strava_models(strava_history):
+    activities = await routes.service.get_activities(ActivityFilter(page=1, per_page=5))
+
+    assert [a.id for a in activities] == [0, 1, 2, 3, 4]
+    assert {a.source for a in activities} == {"strava"}
+    assert activities[1].gear_name == "Trail shoe"
+
+
+async def test_listed_activity_gpx_skips_detail_lookup(strava_history, tmp_path, monkeypatch):
+    async def unexpected_lookup(activity_id):
+        raise AssertionError("listed activities should not be fetched again")
+
+    async def fake_streams(activity_id):
+        return ActivityStreams.model_validate(
+            {"latlng": {"data": [[46.1, 7.2]]}, "time": {"data": [0]}}
+        )
+
+    monkeypatch.setattr(routes.service, "get_activity_by_id", unexpected_lookup)
+    monkeypatch.setattr(routes.service, "get_activity_streams", fake_streams)
+    await routes.service.get_activities(ActivityFilter(page=1, per_page=5))
+
+    path = await routes.service.download_gpx(2, save_path=str(tmp_path))
+
+    with open(path, encoding="utf-8") as f:
+        assert "<name>Run 2</name>" in f.read()
+
+
+async def test_limited_running_list_stops_once_enough_runs_are_found(strava_history):
+    runs = await routes.service.get_running_activities(limit=2)
+
+    assert [a.id for a in runs] == [0, 1]
+    assert len(strava_history) == 1
+
+
+async def test_gear_check_without_date_scans_recent_history(monkeypatch):
+    filters = []
+
+    async def fake_get_activities(activity_filter=None, all_pages=False):
+        filters.append(activity_filter)
+        return []
+
+    monkeypatch.setattr(routes.service, "get_activities", fake_get_activities)
+
+    await routes.service.get_activities_without_gear(lookback_days=30)
+    await routes.service.get_activities_without_gear(lookback_days=0)
+
+    recent, everything = filters
+    assert timedelta(days=29) < datetime.now(timezone.utc) - recent.after <= timedelta(days=30, seconds=5)
+    assert everything.after is None
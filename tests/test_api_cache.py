@@ -0,0 +1,61 @@
+"""Tests for the in-process API response cache."""
+
+import pytest
+
+from app.api import routes
+from app.api.cache import response_cache
+from app.services.strava_service import StravaAPIError
+
+pytestmark = pytest.mark.usefixtures("clear_response_cache")
+
+
+def test_stats_summary_is_served_from_cache(client, monkeypatch):
+    calls = 0
+
+    async def fake_get_activity_summaries(activity_filter=None):
+        nonlocal calls
+        calls += 1
+        return []
+
+    monkeypatch.setattr(routes.service, "get_activity_summaries", fake_get_activity_summaries)
+
+    first = client.get("/api/v1/stats/summary?range=all")
+    second = client.get("/api/v1/stats/summary?range=all")
+
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert second.headers["X-Cache"] == "hit"
+    assert second.json() == first.json()
+    assert calls == 1
+
+
+def test_stale_response_is_returned_on_strava_error(client, monkeypatch):
+    async def fake_get_activity_summaries(activity_filter=None):
+        return []
+
+    async def failing_get_activity_summaries(activity_filter=None):
+        raise StravaAPIError("rate limited")
+
+    monkeypatch.setattr(routes.service, "get_activity_summaries", fake_get_activity_summaries)
+    fresh = client.get("/api/v1/stats/summary?range=all")
+
+    for entry in response_cache._entries.values():
+        entry.stale_at = 0
+    monkeypatch.setattr(routes.service, "get_activity_summaries", failing_get_activity_summaries)
+    stale = client.get("/api/v1/stats/summary?range=all")
+
+    assert stale.status_code == 200
+    assert stale.headers["X-Cache"] == "stale"
+    assert stale.json() == fresh.json()
+
+
+def test_strava_error_without_cached_response_is_bad_request(client, monkeypatch):
+    async def failing_get_activity_summaries(activity_filter=None):
+        raise StravaAPIError("rate limited")
+
+    monkeypatch.setattr(routes.service, "get_activity_summaries", failing_get_activity_summaries)
+
+    response = client.get("/api/v1/stats/summary?range=all")
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "rate limited"
@@ -0,0 +1,16 @@
+"""Tests for the Strava OAuth helper."""
+
+from urllib.parse import parse_qs, urlsplit
+
+from app.utils.auth import StravaAuthHelper
+
+
+def test_authorization_url_encodes_query_parameters():
+    url = StravaAuthHelper().get_authorization_url(state="a b&c=d")
+
+    parts = urlsplit(url)
+    query = parse_qs(parts.query)
+    assert f"{parts.scheme}://{parts.netloc}{parts.path}" == "https://www.strava.com/oauth/authorize"
+    assert query["state"] == ["a b&c=d"]
+    assert query["redirect_uri"] == ["http://localhost:8000/auth/callback"]
+    assert query["scope"] == ["read,activity:read_all"]
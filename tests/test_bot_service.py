@@ -0,0 +1,378 @@
+"""Tests for the Telegram bot service."""
+
+import asyncio
+import json
+import os
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import settings
+from app.services import bot_service
+from app.services.bot_service import BotService
+
+
+@pytest.fixture
+def bot(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "bot_state_file", str(tmp_path / "bot" / "state.json"))
+    return BotService()
+
+
+async def test_state_is_written_atomically_and_only_when_changed(bot, monkeypatch):
+    bot.state["subscribers"]["42"] = "20:00"
+    await bot._save_state()
+
+    with open(bot.state_file) as f:
+        assert json.load(f) == {"subscribers": {"42": "20:00"}}
+    assert not os.path.exists(bot.state_file + ".tmp")
+
+    def unexpected_replace(*args):
+        raise AssertionError("unchanged state should not be rewritten")
+
+    monkeypatch.setattr("app.services.bot_service.os.replace", unexpected_replace)
+    await bot._save_state()
+
+
+async def test_bare_state_file_name_saves_in_working_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(settings, "bot_state_file", "state.json")
+    bot = BotService()
+
+    bot.state["subscribers"]["42"] = "20:00"
+    await bot._save_state()
+
+    assert json.loads((tmp_path / "state.json").read_text()) == {"subscribers": {"42": "20:00"}}
+
+
+async def test_concurrent_saves_do_not_clobber_the_temp_file(bot, caplog):
+    async def save(chat_id):
+        bot.state["subscribers"][chat_id] = "07:00"
+        await bot._save_state()
+
+    await asyncio.gather(*(save(str(chat_id)) for chat_id in range(3)))
+
+    with open(bot.state_file) as f:
+        assert json.load(f) == {"subscribers": {"0": "07:00", "1": "07:00", "2": "07:00"}}
+    assert "Error saving bot state" not in caplog.text
+
+
+class FakeMessage:
+    async def edit_text(self, text):
+        self.text = text
+
+
+class FakeBot:
+    def __init__(self):
+        self.documents = []
+        self.messages = []
+
+    async def send_message(self, chat_id, text):
+        self.messages.append(text)
+        return FakeMessage()
+
+    async def send_document(self, chat_id, document, filename, caption):
+        self.documents.append((filename, document))
+
+
+async def test_gpx_download_reuses_name_from_activity_link(bot, tmp_path, monkeypatch):
+    gpx_path = tmp_path / "7.gpx"
+    gpx_path.write_text("<gpx></gpx>")
+    downloads = []
+
+    async def unexpected_lookup(activity_id):
+        raise AssertionError("activity name should come from the link cache")
+
+    async def fake_download_gpx(activity_id, activity_name=None, activity=None):
+        downloads.append((activity_id, activity_name, activity))
+        return str(gpx_path)
+
+    monkeypatch.setattr(bot.activity_service, "get_activity_by_id", unexpected_lookup)
+    monkeypatch.setattr(bot.activity_service, "download_gpx", fake_download_gpx)
+    bot.application = SimpleNamespace(bot=FakeBot())
+    bot._remember_activity_name(7, "Evening Run")
+
+    await bot.download_and_send_gpx(chat_id=1, activity_id=7)
+
+    assert downloads == [(7, "Evening Run", None)]
+    assert bot.application.bot.documents == [("Evening Run.gpx", b"<gpx></gpx>")]
+    # A fast send needs no progress message.
+    assert bot.application.bot.messages == []
+
+
+async def test_repeated_gear_checks_reuse_one_strava_fetch(bot, monkeypatch):
+    calls = []
+
+    async def fake_without_gear(after=None):
+        calls.append(after)
+        return []
+
+    monkeypatch.setattr(bot.activity_service, "get_activities_without_gear", fake_without_gear)
+    after = datetime(2025, 6, 30, 8, 15, 42)
+
+    await bot._get_activities_without_gear(after)
+    await bot._get_activities_without_gear(after.replace(minute=45))
+
+    assert calls == [datetime(2025, 6, 30, 8, 0)]
+
+    monkeypatch.setattr(settings, "bot_check_cache_ttl", 0)
+    await bot._get_activities_without_gear(after)
+
+    assert len(calls) == 2
+
+
+async def test_hour_bucketed_gear_check_keeps_exact_after_bound(bot, monkeypatch):
+    bucket_start = datetime(2025, 6, 30, 8, 5)
+    boundary = SimpleNamespace(id=1, start_ts=bucket_start.timestamp())
+    inside = SimpleNamespace(id=2, start_ts=bucket_start.replace(minute=40).timestamp())
+
+    async def fake_without_gear(after=None):
+        return [boundary, inside]
+
+    monkeypatch.setattr(bot.activity_service, "get_activities_without_gear", fake_without_gear)
+    after = datetime(2025, 6, 30, 8, 15)
+
+    assert [a.id for a in await bot._get_activities_without_gear(after)] == [2]
+    # Served from the hour-bucket cache, still trimmed to the exact bound.
+    assert [a.id for a in await bot._get_activities_without_gear(after)] == [2]
+    assert [a.id for a in await bot._get_activities_without_gear(after.replace(minute=0))] == [1, 2]
+
+
+async def test_non_link_messages_do_not_reach_strava(bot, monkeypatch):
+    async def unexpected_lookup(activity_id):
+        raise AssertionError("plain messages should be ignored")
+
+    monkeypatch.setattr(bot.activity_service, "get_activity_by_id", unexpected_lookup)
+    update = SimpleNamespace(message=SimpleNamespace(text="see you at the trailhead"))
+
+    await bot.handle_activity_link(update, context=None)
+
+
+async def test_activity_link_reply_shows_pace_and_escaped_gear(bot, monkeypatch):
+    replies = []
+    markups = []
+
+    async def reply_text(text, reply_markup=None, **kwargs):
+        replies.append(text)
+        if reply_markup is not None:
+            markups.append(reply_markup)
+
+    async def fake_get_activity_by_id(activity_id):
+        return SimpleNamespace(
+            name="Tempo <5k>",
+            start_date=datetime(2025, 6, 30, 8, 0),
+            sport_type="Run",
+            distance=5_000.0,
+            moving_time=1_530,
+            average_speed=3.333,
+            gear_id="g1",
+            gear_name="Pegasus & co",
+        )
+
+    monkeypatch.setattr(bot.activity_service, "get_activity_by_id", fake_get_activity_by_id)
+    update = SimpleNamespace(message=SimpleNamespace(
+        text="https://www.strava.com/activities/7", reply_text=reply_text
+    ))
+
+    await bot.handle_activity_link(update, context=None)
+
+    assert markups[0] is bot_service._gpx_markup(7)
+    assert markups[0].inline_keyboard[0][0].callback_data == "gpx_7"
+    assert replies[1] == (
+        "🏃 <b>Tempo &lt;5k&gt;</b>\n"
+        "📅 2025-06-30 08:00\n"
+        "🏷 Type: Run\n"
+        "📏 Distance: 5.00 km\n"
+        "⏱ Time: 25 min\n📈 Pace: 5:00 min/km\n"
+        "\n👟 Gear: Pegasus &amp; co"
+    )
+
+
+async def test_gear_check_message_escapes_activity_names(bot, monkeypatch):
+    sent = []
+
+    class RecordingBot(FakeBot):
+        async def send_message(self, chat_id, text, **kwargs):
+            sent.append(text)
+
+    activities = [
+        SimpleNamespace(id=i, name=f"Run <{i}>", start_date=datetime(2025, 6, 30))
+        for i in range(12)
+    ]
+
+    async def fake_without_gear(after_date):
+        return activities
+
+    monkeypatch.setattr(bot, "_get_activities_without_gear", fake_without_gear)
+    bot.application = SimpleNamespace(bot=RecordingBot())
+
+    await bot.check_activities_without_gear(chat_id=1, days_back=7)
+
+    message = sent[0]
+    assert message.startswith("⚠️ Found 12 activities without gear (last 7 days):\n\n")
+    assert "• <a href='https://www.strava.com/activities/0'>Run &lt;0&gt;</a> (2025-06-30)" in message
+    assert "Run <10>" not in message
+    assert message.endswith("\n\n...and 2 more.")
+
+
+async def test_gear_check_without_days_names_the_lookback_window(bot, monkeypatch):
+    sent = []
+
+    class RecordingBot(FakeBot):
+        async def send_message(self, chat_id, text, **kwargs):
+            sent.append(text)
+
+    async def fake_without_gear(after_date):
+        return [SimpleNamespace(id=1, name="Run", start_date=datetime(2025, 6, 30))]
+
+    monkeypatch.setattr(bot, "_get_activities_without_gear", fake_without_gear)
+    monkeypatch.setattr(settings, "strava_no_gear_lookback_days", 180)
+    bot.application = SimpleNamespace(bot=RecordingBot())
+
+    await bot.check_activities_without_gear(chat_id=1)
+    monkeypatch.setattr(settings, "strava_no_gear_lookback_days", 0)
+    await bot.check_activities_without_gear(chat_id=1)
+
+    assert sent[0].startswith("⚠️ Found 1 activities without gear (last 180 days):")
+    assert sent[1].startswith("⚠️ Found 1 activities without gear:")
+
+
+async def test_slow_gpx_download_shows_progress(bot, tmp_path, monkeypatch):
+    gpx_path = tmp_path / "7.gpx"
+    gpx_path.write_text("<gpx></gpx>")
+
+    async def slow_download_gpx(activity_id, activity_name=None, activity=None):
+        await asyncio.sleep(0.01)
+        return str(gpx_path)
+
+    monkeypatch.setattr("app.services.bot_service.PROGRESS_MESSAGE_DELAY", 0)
+    monkeypatch.setattr(bot.activity_service, "download_gpx", slow_download_gpx)
+    bot.application = SimpleNamespace(bot=FakeBot())
+    bot._remember_activity_name(7, "Evening Run")
+
+    await bot.download_and_send_gpx(chat_id=1, activity_id=7)
+
+    assert bot.application.bot.messages == ["📥 Downloading GPX file..."]
+
+
+async def test_in_flight_progress_message_is_still_edited(bot, tmp_path, monkeypatch):
+    gpx_path = tmp_path / "7.gpx"
+    gpx_path.write_text("<gpx></gpx>")
+    progress = FakeMessage()
+
+    class SlowSendBot(FakeBot):
+        async def send_message(self, chat_id, text):
+            # The download finishes while this send is still in flight.
+            await asyncio.sleep(0.02)
+            self.messages.append(text)
+            return progress
+
+    async def slow_download_gpx(activity_id, activity_name=None, activity=None):
+        await asyncio.sleep(0.01)
+        return str(gpx_path)
+
+    monkeypatch.setattr("app.services.bot_service.PROGRESS_MESSAGE_DELAY", 0)
+    monkeypatch.setattr(bot.activity_service, "download_gpx", slow_download_gpx)
+    bot.application = SimpleNamespace(bot=SlowSendBot())
+    bot._remember_activity_name(7, "Evening Run")
+
+    await bot.download_and_send_gpx(chat_id=1, activity_id=7)
+
+    assert bot.application.bot.messages == ["📥 Downloading GPX file..."]
+    assert progress.text == "✅ GPX file sent successfully!"
+
+
+def test_state_defaults_when_missing_and_migrates_single_chat_layout(bot, tmp_path, monkeypatch):
+    assert bot.state == {"subscribers": {}}
+
+    state_file = tmp_path / "saved.json"
+    state_file.write_text('{"chat_id": 5, "schedule_time": "20:00"}')
+    monkeypatch.setattr(settings, "bot_state_file", str(state_file))
+
+    assert BotService().state == {"subscribers": {"5": "20:00"}}
+
+
+def chat_update(chat_id: int):
+    return SimpleNamespace(
+        effective_chat=SimpleNamespace(id=chat_id),
+        message=SimpleNamespace(reply_text=FakeMessage().edit_text),
+    )
+
+
+async def test_subscribers_share_one_job_per_time_and_keep_cleanup(bot):
+    bot.scheduler.add_job(bot.cleanup_gpx_job, "interval", hours=24, id="gpx_cleanup")
+
+    await bot.schedule_command(chat_update(1), SimpleNamespace(args=["20:00"]))
+    await bot.schedule_command(chat_update(2), SimpleNamespace(args=["20:00"]))
+    await bot.schedule_command(chat_update(3), SimpleNamespace(args=["07:30"]))
+
+    assert bot.state["subscribers"] == {"1": "20:00", "2": "20:00", "3": "07:30"}
+    assert {job.id for job in bot.scheduler.get_jobs()} == {
+        "gpx_cleanup", "daily_check_20:00", "daily_check_07:30"
+    }
+
+    await bot.stop_command(chat_update(3), context=None)
+    await bot.stop_command(chat_update(3), context=None)
+
+    assert {job.id for job in bot.scheduler.get_jobs()} == {"gpx_cleanup", "daily_check_20:00"}
+
+
+async def test_concurrent_schedule_and_stop_keep_state_and_jobs_consistent(bot):
+    await bot.schedule_command(chat_update(1), SimpleNamespace(args=["20:00"]))
+
+    await asyncio.gather(
+        bot.schedule_command(chat_update(2), SimpleNamespace(args=["07:30"])),
+        bot.stop_command(chat_update(1), context=None),
+        bot.schedule_command(chat_update(3), SimpleNamespace(args=["07:30"])),
+    )
+
+    assert bot.state["subscribers"] == {"2": "07:30", "3": "07:30"}
+    assert {job.id for job in bot.scheduler.get_jobs()} == {"daily_check_07:30"}
+    with open(bot.state_file) as f:
+        assert json.load(f) == bot.state
+
+
+async def test_scheduled_check_fetches_once_for_all_chats_at_that_time(bot, monkeypatch):
+    calls = []
+    recorder = FakeBot()
+
+    async def fake_without_gear(after_date):
+        calls.append(after_date)
+        return []
+
+    monkeypatch.setattr(bot, "_get_activities_without_gear", fake_without_gear)
+    bot.application = SimpleNamespace(bot=recorder)
+    bot.state["subscribers"] = {"1": "20:00", "2": "20:00", "3": "07:30"}
+
+    await bot.scheduled_check("20:00")
+
+    assert len(calls) == 1
+    # Scheduled checks stay silent when everything has gear.
+    assert recorder.messages == []
+
+
+@pytest.mark.parametrize("time_str", ["24:00", "7:60", "20-00", "20:00pm"])
+async def test_schedule_rejects_invalid_times(bot, time_str):
+    replies = []
+    update = SimpleNamespace(
+        effective_chat=SimpleNamespace(id=1),
+        message=SimpleNamespace(reply_text=lambda text: _record(replies, text)),
+    )
+
+    await bot.schedule_command(update, SimpleNamespace(args=[time_str]))
+
+    assert replies == ["Invalid time format. Please use HH:MM (24-hour)."]
+    assert bot.state["subscribers"] == {}
+
+
+async def _record(replies, text):
+    replies.append(text)
+
+
+async def test_shutdown_closes_strava_connection_pool(bot):
+    client = bot.activity_service._get_http_client()
+
+    await bot.shutdown()
+
+    assert client.is_closed
+    assert bot.activity_service.http_client is None
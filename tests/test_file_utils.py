@@ -0,0 +1,39 @@
+"""Tests for GPX file management helpers."""
+
+from app.config import settings
+from app.utils.file_utils import FileManager, safe_filename
+from app.utils.gpx_cleanup import cleanup_all_gpx_files
+
+
+def test_safe_filename_replaces_separators_and_reserved_characters():
+    assert safe_filename('Run 5/6: "hills" <x>|?*\\') == "Run_5_6___hills___x_____"
+    assert safe_filename("Evening-Run") == "Evening-Run"
+
+
+def test_storage_stats_and_cleanup_only_count_gpx_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "gpx_storage_path", str(tmp_path))
+    (tmp_path / "1.gpx").write_bytes(b"a" * 10)
+    (tmp_path / "2.gpx").write_bytes(b"b" * 20)
+    (tmp_path / "2.gpx.tmp").write_bytes(b"partial")
+    (tmp_path / "nested.gpx").mkdir()
+    manager = FileManager()
+
+    assert sorted(manager.list_gpx_files()) == ["1.gpx", "2.gpx"]
+    assert manager.get_storage_stats()["total_size_bytes"] == 30
+
+    stats = cleanup_all_gpx_files(str(tmp_path))
+
+    assert stats["files_deleted"] == 2
+    assert stats["space_freed"] == 30
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["2.gpx.tmp", "nested.gpx"]
+
+
+async def test_gpx_file_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "gpx_storage_path", str(tmp_path))
+    manager = FileManager()
+
+    path = await manager.save_gpx_file(b"<gpx></gpx>", "7.gpx")
+
+    assert path == str(tmp_path / "7.gpx")
+    assert await manager.read_gpx_file("7.gpx") == b"<gpx></gpx>"
+    assert await manager.read_gpx_file("missing.gpx") is None
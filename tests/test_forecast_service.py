@@ -1,5 +1,6 @@
 """Tests for GPX checkpoint extraction and trail forecast calculation."""
 
+import asyncio
 from datetime import datetime
 from types import SimpleNamespace
 
@@ -10,7 +11,9 @@ from app.models.forecast import (
     ForecastRequest,
     HistoricalActivitySelection,
 )
-from app.services.forecast_service import ForecastService
+from app.services import forecast_service
+from app.services.forecast_service import ForecastService, ForecastServiceError
+from app.services.strava_service import StravaAPIError
 
 
 SAMPLE_GPX = b"""<?xml version="1.0" encoding="UTF-8"?>
@@ -66,7 +69,6 @@ def test_forecast_request_requires_a_past_race():
         )
 
 
-@pytest.mark.asyncio
 async def test_calculate_returns_checkpoint_and_finish_ranges(tmp_path):
     service = ForecastService(FakeActivityService())
     service.route_storage = tmp_path
@@ -94,13 +96,81 @@ async def test_calculate_returns_checkpoint_and_finish_ranges(tmp_path):
     assert result.checkpoints[-1].expected_at is not None
 
 
-def test_race_forecast_page_is_available():
-    from fastapi.testclient import TestClient
-
-    from app.main import app
-
-    response = TestClient(app).get("/race-forecast")
+def test_race_forecast_page_is_available(client):
+    response = client.get("/race-forecast")
 
     assert response.status_code == 200
     assert "Прогноз трейловой гонки" in response.text
     assert 'id="checkpoints-body"' in response.text
+
+
+async def test_calculate_reports_strava_errors(tmp_path):
+    class FailingActivityService(FakeActivityService):
+        async def get_activity_by_id(self, activity_id: int):
+            if activity_id == 2:
+                raise StravaAPIError("Activity not found")
+            return await super().get_activity_by_id(activity_id)
+
+    service = ForecastService(FailingActivityService())
+    service.route_storage = tmp_path
+    preview = service.store_route(SAMPLE_GPX, "test.gpx")
+    request = ForecastRequest(
+        route_id=preview.route_id,
+        activities=[
+            HistoricalActivitySelection(activity_id=1, source="strava", is_race=True),
+            HistoricalActivitySelection(activity_id=2, source="strava", is_race=False),
+        ],
+    )
+
+    with pytest.raises(ForecastServiceError, match="Activity not found"):
+        await service.calculate(request)
+
+
+async def test_calculate_bounds_and_deduplicates_activity_lookups(tmp_path, monkeypatch):
+    monkeypatch.setattr(forecast_service, "ACTIVITY_FETCH_CONCURRENCY", 2)
+    requested = []
+    in_flight = peak = 0
+
+    class CountingActivityService(FakeActivityService):
+        async def get_activity_by_id(self, activity_id: int):
+            nonlocal in_flight, peak
+            requested.append(activity_id)
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return await super().get_activity_by_id(activity_id)
+
+    service = ForecastService(CountingActivityService())
+    service.route_storage = tmp_path
+    preview = service.store_route(SAMPLE_GPX, "test.gpx")
+    request = ForecastRequest(
+        route_id=preview.route_id,
+        activities=[
+            HistoricalActivitySelection(activity_id=i % 5, source="strava", is_race=True)
+            for i in range(8)
+        ],
+    )
+
+    result = await service.calculate(request)
+
+    assert sorted(requested) == [0, 1, 2, 3, 4]
+    assert peak == 2
+    assert result.activities_used == 8
+
+
+async def test_calculate_raises_unexpected_errors_unwrapped(tmp_path):
+    class BrokenActivityService(FakeActivityService):
+        async def get_activity_by_id(self, activity_id: int):
+            raise KeyError("distance")
+
+    service = ForecastService(BrokenActivityService())
+    service.route_storage = tmp_path
+    preview = service.store_route(SAMPLE_GPX, "test.gpx")
+    request = ForecastRequest(
+        route_id=preview.route_id,
+        activities=[HistoricalActivitySelection(activity_id=1, source="strava", is_race=True)],
+    )
+
+    with pytest.raises(KeyError):
+        await service.calculate(request)
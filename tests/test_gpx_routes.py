@@ -0,0 +1,142 @@
+"""Tests for serving and building GPX files."""
+
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import gpxpy
+import pytest
+
+from app.api import routes
+from app.config import settings
+from app.models.strava import ActivityStreams
+from app.services.strava_service import TPE_NS, StravaService
+
+
+GPX = '<?xml version="1.0"?><gpx version="1.1" creator="test"></gpx>'
+
+
+@pytest.fixture
+def gpx_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "gpx_storage_path", str(tmp_path))
+    return tmp_path
+
+
+def test_existing_gpx_is_served_without_strava(client, gpx_storage, monkeypatch):
+    (gpx_storage / "42.gpx").write_text(GPX)
+
+    async def unexpected_download(*args, **kwargs):
+        raise AssertionError("Strava should not be called for a stored GPX file")
+
+    monkeypatch.setattr(routes.service, "download_gpx", unexpected_download)
+
+    response = client.get("/api/v1/activities/42/gpx?activity_name=Morning Run")
+
+    assert response.status_code == 200
+    assert response.text == GPX
+    assert response.headers["cache-control"] == "public, max-age=86400"
+    assert "last-modified" in response.headers
+    assert "Morning%20Run.gpx" in response.headers["content-disposition"]
+
+    revalidated = client.get(
+        "/api/v1/activities/42/gpx", headers={"If-None-Match": response.headers["etag"]}
+    )
+
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == response.headers["etag"]
+
+
+async def test_concurrent_downloads_build_the_file_once(gpx_storage, monkeypatch):
+    service = StravaService()
+    builds = 0
+
+    async def fake_build_gpx(activity_id, file_path, activity_name, activity=None):
+        nonlocal builds
+        builds += 1
+        await asyncio.sleep(0)
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(GPX)
+        return file_path
+
+    monkeypatch.setattr(service, "_build_gpx", fake_build_gpx)
+
+    paths = await asyncio.gather(*(service.download_gpx(7) for _ in range(3)))
+
+    assert builds == 1
+    assert set(paths) == {str(gpx_storage / "7.gpx")}
+
+
+async def test_empty_gpx_file_is_rebuilt(gpx_storage, monkeypatch):
+    (gpx_storage / "9.gpx").write_text("")
+    service = StravaService()
+    builds = []
+
+    async def fake_build_gpx(activity_id, file_path, activity_name, activity=None):
+        builds.append(activity_id)
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(GPX)
+        return file_path
+
+    monkeypatch.setattr(service, "_build_gpx", fake_build_gpx)
+
+    assert service.stored_gpx_path(9) is None
+    await service.download_gpx(9)
+
+    assert builds == [9]
+    assert service.stored_gpx_path(9) == str(gpx_storage / "9.gpx")
+
+
+async def test_built_gpx_has_times_elevation_and_garmin_extensions(gpx_storage, monkeypatch):
+    service = StravaService()
+    activity = SimpleNamespace(
+        name="Ridge & <Back>", start_date=datetime(2025, 6, 30, 8, 0, tzinfo=timezone.utc)
+    )
+
+    async def fake_streams(activity_id):
+        return ActivityStreams.model_validate({
+            "latlng": {"data": [[46.1, 7.2], [46.2, 7.3], [46.3, 7.4]]},
+            "time": {"data": [0, 5, 10]},
+            "altitude": {"data": [100.5, 101.0, 102.0]},
+            "heartrate": {"data": [120, 130]},
+            "cadence": {"data": [80]},
+        })
+
+    monkeypatch.setattr(service, "get_activity_streams", fake_streams)
+
+    path = await service.download_gpx(5, activity=activity)
+
+    with open(path, encoding="utf-8") as f:
+        gpx = gpxpy.parse(f)
+    points = gpx.tracks[0].segments[0].points
+    assert gpx.name == "Ridge & <Back>"
+    assert [(p.latitude, p.longitude, p.elevation) for p in points] == [
+        (46.1, 7.2, 100.5), (46.2, 7.3, 101.0), (46.3, 7.4, 102.0)
+    ]
+    assert points[1].time == datetime(2025, 6, 30, 8, 0, 5, tzinfo=timezone.utc)
+    extension = points[0].extensions[0]
+    assert extension.find(f"{{{TPE_NS}}}hr").text == "120"
+    assert extension.find(f"{{{TPE_NS}}}cad").text == "80"
+    assert points[2].extensions == []
+
+
+async def test_activity_streams_are_decoded_into_typed_models(monkeypatch):
+    service = StravaService()
+    cache_flags = []
+
+    async def fake_make_request_raw(method, endpoint, params=None, json_data=None, cache=True):
+        cache_flags.append(cache)
+        return (
+            b'{"latlng": {"data": [[46.1, 7.2]], "series_type": "distance",'
+            b' "original_size": 1, "resolution": "high"},'
+            b' "heartrate": {"data": [121.0]}}'
+        )
+
+    monkeypatch.setattr(service, "_make_request_raw", fake_make_request_raw)
+
+    streams = await service.get_activity_streams(5)
+
+    assert streams.latlng.data == [(46.1, 7.2)]
+    assert streams.heartrate.data == [121]
+    # Stream bodies are too large to keep in the ETag cache.
+    assert cache_flags == [False]
+    assert streams.time is None
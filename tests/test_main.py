@@ -1,29 +1,45 @@
 """Basic tests for the main application."""
 
-import pytest
-from fastapi.testclient import TestClient
-from app.main import app
+import asyncio
 
-client = TestClient(app)
+import httpx
+import pytest
 
 
-def test_health_check():
-    """Test the health check endpoint."""
-    response = client.get("/health")
+@pytest.mark.parametrize(
+    "path,expected_key,expected_val",
+    [("/health", "status", "healthy"), ("/api/v1/", "status", "ok")],
+)
+def test_health_checks(health_client, path, expected_key, expected_val):
+    """Test the app and API health check endpoints."""
+    response = health_client.get(path)
     assert response.status_code == 200
-    data = response.json()
-    assert data["status"] == "healthy"
-    assert data["app"] == "Strava NoShoes"
+    assert response.json()[expected_key] == expected_val
+
+
+def test_health_check_names_app(health_client):
+    """Test the health check reports the application name."""
+    assert health_client.get("/health").json()["app"] == "Strava NoShoes"
+
 
+async def test_smoke_endpoints_concurrently(app):
+    """Test the smoke endpoints answer when requested together."""
+    paths = ["/health", "/api/v1/", "/"]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        responses = await asyncio.gather(*(ac.get(p) for p in paths))
 
-def test_root_endpoint():
+    assert [r.status_code for r in responses] == [200, 200, 200]
+
+
+def test_root_endpoint(client):
     """Test the root endpoint returns HTML."""
     response = client.get("/")
     assert response.status_code == 200
     assert "text/html" in response.headers["content-type"]
 
 
-def test_custom_ranges_wait_for_dates_before_loading():
+def test_custom_ranges_wait_for_dates_before_loading(client):
     """Custom ranges should not fetch all history before dates are selected."""
     response = client.get("/")
     assert response.status_code == 200
@@ -40,7 +56,7 @@ def test_custom_ranges_wait_for_dates_before_loading():
     ) in html
 
 
-def test_activity_cards_show_weekday_dates():
+def test_activity_cards_show_weekday_dates(client):
     """Activity cards should include weekday-aware date formatting."""
     response = client.get("/")
     assert response.status_code == 200
@@ -51,7 +67,7 @@ def test_activity_cards_show_weekday_dates():
     assert "${formatActivityDateWithWeekday(activity.start_date)}" in html
 
 
-def test_preset_activity_ranges_include_current_day():
+def test_preset_activity_ranges_include_current_day(client):
     """Activity requests should convert end dates to exclusive upper bounds."""
     response = client.get("/")
     assert response.status_code == 200
@@ -64,7 +80,7 @@ def test_preset_activity_ranges_include_current_day():
     ) in html
 
 
-def test_custom_stats_range_includes_end_date():
+def test_custom_stats_range_includes_end_date(client):
     """Custom stats requests should convert end dates to exclusive upper bounds."""
     response = client.get("/")
     assert response.status_code == 200
@@ -73,7 +89,7 @@ def test_custom_stats_range_includes_end_date():
     assert "if (before) url += `&before=${toExclusiveBeforeDateKey(before)}`;" in html
 
 
-def test_calendar_view_mode_is_available():
+def test_calendar_view_mode_is_available(client):
     """The activity list should support an optional calendar view."""
     response = client.get("/")
     assert response.status_code == 200
@@ -86,7 +102,7 @@ def test_calendar_view_mode_is_available():
     assert "strava_view_mode" in html
 
 
-def test_calendar_activity_meta_uses_ascii_separator():
+def test_calendar_activity_meta_uses_ascii_separator(client):
     """Calendar activity labels should not render mojibake separators."""
     response = client.get("/")
     assert response.status_code == 200
@@ -96,44 +112,16 @@ def test_calendar_activity_meta_uses_ascii_separator():
     assert "${typeLabel} - ${(activity.distance / 1000).toFixed(2)} km" in html
 
 
-def test_api_health_check():
-    """Test the API health check endpoint."""
-    response = client.get("/api/v1/")
-    assert response.status_code == 200
-    data = response.json()
-    assert data["status"] == "ok"
-
-
-@pytest.mark.asyncio
-async def test_config_loading():
-    """Test that configuration loads properly."""
-    from app.config import settings
-    
-    # Test that settings object exists and has required attributes
+def test_package_surfaces(app_modules, settings):
+    """Test that config, models and services import cleanly."""
     assert hasattr(settings, 'strava_client_id')
     assert hasattr(settings, 'strava_client_secret')
     assert hasattr(settings, 'app_host')
     assert hasattr(settings, 'app_port')
 
+    assert app_modules.Activity is not None
+    assert app_modules.Athlete is not None
+    assert app_modules.Gear is not None
+    assert app_modules.StravaTokens is not None
 
-def test_models_import():
-    """Test that models can be imported without errors."""
-    from app.models.strava import Activity, Athlete, Gear, StravaTokens
-    
-    # Test that classes exist
-    assert Activity is not None
-    assert Athlete is not None
-    assert Gear is not None
-    assert StravaTokens is not None
-
-
-def test_services_import():
-    """Test that services can be imported without errors."""
-    from app.services.strava_service import StravaService
-    
-    # Test that service class exists
-    assert StravaService is not None
-    
-    # Test that service can be instantiated
-    service = StravaService()
-    assert service is not None
+    assert callable(app_modules.StravaService)
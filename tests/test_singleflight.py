@@ -0,0 +1,49 @@
+"""Tests for single-flight deduplication of concurrent calls."""
+
+import asyncio
+
+import pytest
+
+from app.utils import singleflight
+from app.utils.singleflight import run_once
+
+
+async def test_concurrent_callers_share_one_call():
+    calls = 0
+    release = asyncio.Event()
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return ["activity"]
+
+    waiters = [asyncio.create_task(run_once("key", fetch)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters)
+
+    assert calls == 1
+    assert results == [["activity"]] * 3
+    assert "key" not in singleflight._inflight
+
+
+async def test_errors_reach_every_caller_and_are_not_cached():
+    calls = 0
+
+    async def failing():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        raise RuntimeError("upstream down")
+
+    results = await asyncio.gather(
+        run_once("key", failing), run_once("key", failing), return_exceptions=True
+    )
+
+    assert calls == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    with pytest.raises(RuntimeError):
+        await run_once("key", failing)
+    assert calls == 2
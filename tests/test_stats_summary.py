@@ -0,0 +1,114 @@
+"""Tests for the /stats/summary aggregation."""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from app.api import routes
+from app.api.routes import _summarize_activities
+from app.models.strava import ActivitySummary
+from app.services.strava_service import StravaService
+
+
+def make_activity(sport_type: str, distance: float, moving_time: int, gear_id=None):
+    return SimpleNamespace(
+        sport_type=sport_type,
+        distance=distance,
+        moving_time=moving_time,
+        gear_id=gear_id,
+    )
+
+
+def test_summary_totals_and_per_type_details():
+    activities = [
+        make_activity("Run", 10_000.0, 3_000, gear_id="g1"),
+        make_activity("Run", 5_000.0, 1_500),
+        make_activity("Ride", 40_000.0, 5_400),
+    ]
+
+    summary = _summarize_activities(activities)
+
+    assert summary["total"] == {
+        "count": 3,
+        "distance_meters": 55_000.0,
+        "distance_km": 55.0,
+        "time_seconds": 9_900,
+        "time_hours": 2.75,
+        "activities_without_gear": 2,
+    }
+    assert summary["activity_types_count"] == {"Run": 2, "Ride": 1}
+    assert summary["activity_types_detailed"]["Run"] == {
+        "count": 2,
+        "distance_meters": 15_000.0,
+        "distance_km": 15.0,
+        "time_seconds": 4_500,
+        "time_hours": 1.25,
+    }
+
+
+def test_summary_of_no_activities_is_zeroed():
+    summary = _summarize_activities([])
+
+    assert summary["total"]["count"] == 0
+    assert summary["total"]["distance_km"] == 0
+    assert summary["activity_types_count"] == {}
+    assert summary["activity_types_detailed"] == {}
+
+
+async def test_activity_summaries_skip_gear_lookups(monkeypatch):
+    service = StravaService()
+    requested = []
+
+    async def fake_make_request(method, endpoint, params=None, json_data=None):
+        requested.append(endpoint)
+        if params["page"] > 1:
+            return []
+        return [
+            {
+                "id": 1,
+                "sport_type": "Run",
+                "distance": 5_000.0,
+                "moving_time": 1_500,
+                "gear_id": "g1",
+                "start_date": "2025-06-30T08:00:00Z",
+                "map": {"id": "a1", "summary_polyline": "abc"},
+            }
+        ]
+
+    monkeypatch.setattr(service, "_make_request", fake_make_request)
+
+    summaries = await service.get_activity_summaries()
+
+    assert [s.id for s in summaries] == [1]
+    assert summaries[0].gear_id == "g1"
+    assert requested == ["/athlete/activities"]
+
+
+def test_summary_start_timestamp_is_not_serialized():
+    summary = ActivitySummary(
+        id=1,
+        sport_type="Run",
+        distance=5_000.0,
+        moving_time=1_500,
+        start_date="2025-06-30T08:00:00Z",
+    )
+
+    assert summary.start_ts == summary.start_date.timestamp()
+    assert "start_ts" not in summary.model_dump()
+
+
+def test_stats_range_sets_utc_after_bound(client, clear_response_cache, monkeypatch):
+    filters = []
+
+    async def fake_get_activity_summaries(activity_filter=None):
+        filters.append(activity_filter)
+        return []
+
+    monkeypatch.setattr(routes.service, "get_activity_summaries", fake_get_activity_summaries)
+
+    client.get("/api/v1/stats/summary?range=1w")
+    client.get("/api/v1/stats/summary?range=all&after=2025-01-01T00:00:00Z")
+
+    week, everything = filters
+    assert week.after.tzinfo is not None
+    assert timedelta(days=6) < datetime.now(timezone.utc) - week.after <= timedelta(days=7, seconds=5)
+    assert everything.after is None
@@ -3,6 +3,7 @@
 import asyncio
 import json
 import time
+from types import SimpleNamespace
 
 import httpx
 import pytest
@@ -11,6 +12,7 @@ from app.api.forecast_routes import service as forecast_api_service
 from app.api.routes import service as api_service
 from app.config import settings
 from app.main import bot_service
+from app.services import strava_service
 from app.services.strava_service import StravaAPIError, StravaService
 
 
@@ -45,7 +47,6 @@ def test_tokens_for_another_strava_client_are_ignored(tmp_path, monkeypatch):
     assert service.refresh_token == "secondary-refresh"
 
 
-@pytest.mark.asyncio
 async def test_second_401_is_reported_as_strava_auth_error(tmp_path, monkeypatch):
     monkeypatch.setattr(settings, "strava_client_id", "secondary-client")
     monkeypatch.setattr(settings, "strava_client_secret", "secondary-secret")
@@ -70,6 +71,9 @@ async def test_second_401_is_reported_as_strava_auth_error(tmp_path, monkeypatch
     )
 
     class FakeAsyncClient:
+        def __init__(self, *args, **kwargs):
+            pass
+
         async def __aenter__(self):
             return self
 
@@ -91,7 +95,6 @@ async def test_second_401_is_reported_as_strava_auth_error(tmp_path, monkeypatch
         await service._make_request("GET", "/athlete")
 
 
-@pytest.mark.asyncio
 async def test_concurrent_services_refresh_shared_token_only_once(
     tmp_path, monkeypatch
 ):
@@ -106,6 +109,9 @@ async def test_concurrent_services_refresh_shared_token_only_once(
     refresh_count = 0
 
     class FakeAsyncClient:
+        def __init__(self, *args, **kwargs):
+            pass
+
         async def __aenter__(self):
             return self
 
@@ -140,3 +146,292 @@ async def test_concurrent_services_refresh_shared_token_only_once(
     assert refresh_count == 1
     assert first_service.access_token == "shared-new-access"
     assert second_service.access_token == "shared-new-access"
+    assert json.loads(token_file.read_text())["refresh_token"] == "shared-new-refresh"
+    assert not (tmp_path / "shared-tokens.json.tmp").exists()
+
+
+async def test_requests_reuse_one_pooled_http_client(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "strava_access_token", "pooled-access")
+    monkeypatch.setattr(settings, "strava_token_expires_at", 2_000_000_000)
+    monkeypatch.setattr(settings, "strava_token_file", str(tmp_path / "tokens.json"))
+
+    created = 0
+
+    class FakeAsyncClient:
+        def __init__(self, *args, **kwargs):
+            nonlocal created
+            created += 1
+
+        async def request(self, **kwargs):
+            return httpx.Response(
+                200,
+                json={"id": 1, "resource_state": 2},
+                request=httpx.Request(kwargs["method"], kwargs["url"]),
+            )
+
+        async def aclose(self):
+            pass
+
+    monkeypatch.setattr(
+        "app.services.strava_service.httpx.AsyncClient", FakeAsyncClient
+    )
+    service = StravaService()
+
+    await service.get_athlete()
+    await service.get_athlete()
+    await service.aclose()
+
+    assert created == 1
+    assert service.http_client is None
+
+
+async def test_token_refresh_reuses_pooled_http_client(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "strava_client_id", "pooled-client")
+    monkeypatch.setattr(settings, "strava_client_secret", "pooled-secret")
+    monkeypatch.setattr(settings, "strava_access_token", "expired-access")
+    monkeypatch.setattr(settings, "strava_refresh_token", "pooled-refresh")
+    monkeypatch.setattr(settings, "strava_token_expires_at", 0)
+    monkeypatch.setattr(settings, "strava_token_file", str(tmp_path / "tokens.json"))
+
+    created = 0
+
+    class FakeAsyncClient:
+        def __init__(self, *args, **kwargs):
+            nonlocal created
+            created += 1
+
+        async def post(self, url, **kwargs):
+            return httpx.Response(
+                200,
+                json={
+                    "access_token": "pooled-new-access",
+                    "refresh_token": "pooled-new-refresh",
+                    "expires_at": int(time.time()) + 21_600,
+                },
+                request=httpx.Request("POST", url),
+            )
+
+        async def request(self, **kwargs):
+            return httpx.Response(
+                200,
+                json={"id": 1, "resource_state": 2},
+                request=httpx.Request(kwargs["method"], kwargs["url"]),
+            )
+
+    monkeypatch.setattr(
+        "app.services.strava_service.httpx.AsyncClient", FakeAsyncClient
+    )
+    service = StravaService()
+
+    await service.get_athlete()
+
+    assert service.access_token == "pooled-new-access"
+    assert created == 1
+
+
+async def test_aiohttp_backend_wraps_httpx_client(monkeypatch):
+    httpx_aiohttp = pytest.importorskip("httpx_aiohttp")
+    monkeypatch.setattr(settings, "strava_http_backend", "aiohttp")
+
+    from app.services.strava_service import create_http_client
+
+    client = create_http_client()
+    try:
+        assert isinstance(client._transport, httpx_aiohttp.AiohttpTransport)
+    finally:
+        await client.aclose()
+
+
+async def test_all_pages_are_fetched_in_growing_concurrent_windows(monkeypatch):
+    requested_pages = []
+    page_sizes = {1: 200, 2: 200, 3: 200, 4: 50}
+
+    async def fake_make_request(method, endpoint, params=None, json_data=None):
+        requested_pages.append(params["page"])
+        return [{"id": params["page"]}] * page_sizes.get(params["page"], 0)
+
+    service = StravaService()
+    monkeypatch.setattr(service, "_make_request", fake_make_request)
+
+    data = await service._fetch_all_pages({"after": 0})
+
+    assert len(data) == 650
+    # Windows of 1, 2 and 4 pages: the last window overshoots by three pages.
+    assert sorted(requested_pages) == [1, 2, 3, 4, 5, 6, 7]
+
+
+async def test_page_windows_are_capped_to_limit_overshoot(monkeypatch):
+    requested_pages = []
+
+    async def fake_make_request(method, endpoint, params=None, json_data=None):
+        requested_pages.append(params["page"])
+        return [{"id": params["page"]}] * (200 if params["page"] <= 10 else 20)
+
+    service = StravaService()
+    monkeypatch.setattr(service, "_make_request", fake_make_request)
+
+    data = await service._fetch_all_pages({})
+
+    assert len(data) == 2_020
+    # Windows of 1, 2, 4 and 4 pages end exactly at the short page 11.
+    assert sorted(requested_pages) == list(range(1, 12))
+
+
+async def test_rate_limited_requests_are_retried(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "strava_access_token", "limited-access")
+    monkeypatch.setattr(settings, "strava_token_expires_at", 2_000_000_000)
+    monkeypatch.setattr(settings, "strava_token_file", str(tmp_path / "tokens.json"))
+    monkeypatch.setattr("app.services.strava_service.RATE_LIMIT_BACKOFF", 0)
+
+    statuses = [429, 200]
+
+    class FakeAsyncClient:
+        async def request(self, **kwargs):
+            return httpx.Response(
+                statuses.pop(0),
+                json={"id": 1, "resource_state": 2},
+                request=httpx.Request(kwargs["method"], kwargs["url"]),
+            )
+
+    service = StravaService(http_client=FakeAsyncClient())
+
+    athlete = await service.get_athlete()
+
+    assert athlete.id == 1
+    assert statuses == []
+
+
+async def test_gear_names_are_fetched_once_and_shared(monkeypatch):
+    monkeypatch.setattr(strava_service, "_GEAR_NAME_CACHES", {})
+    first = StravaService()
+    second = StravaService()
+    requested = []
+
+    async def fake_make_request(method, endpoint, params=None, json_data=None):
+        requested.append(endpoint)
+        gear_id = endpoint.rsplit("/", 1)[-1]
+        return {"id": gear_id, "name": f"Shoe {gear_id}", "primary": False, "resource_state": 2}
+
+    monkeypatch.setattr(first, "_make_request", fake_make_request)
+    activities = [
+        SimpleNamespace(gear_id=gear_id, gear_name=None)
+        for gear_id in ("g1", "g2", "g1", None)
+    ]
+
+    await first._populate_gear_names_for_activities(activities)
+
+    assert sorted(requested) == ["/gear/g1", "/gear/g2"]
+    assert [a.gear_name for a in activities] == ["Shoe g1", "Shoe g2", "Shoe g1", None]
+    assert second._gear_cache == {"g1": "Shoe g1", "g2": "Shoe g2"}
+
+
+async def test_gear_fetches_are_concurrent_but_bounded(monkeypatch):
+    monkeypatch.setattr(strava_service, "GEAR_FETCH_CONCURRENCY", 2)
+    service = StravaService()
+    active = 0
+    peak = 0
+
+    async def fake_get_gear_by_id(gear_id):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0)
+        active -= 1
+        return None
+
+    monkeypatch.setattr(service, "get_gear_by_id", fake_get_gear_by_id)
+
+    await service._fetch_gear(["g1", "g2", "g3", "g4", "g5"])
+
+    assert peak == 2
+
+
+async def test_headers_are_reused_until_the_token_changes(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "strava_access_token", "first-access")
+    monkeypatch.setattr(settings, "strava_token_expires_at", 2_000_000_000)
+    monkeypatch.setattr(settings, "strava_token_file", str(tmp_path / "tokens.json"))
+    service = StravaService()
+
+    first, second = await asyncio.gather(service._get_headers(), service._get_headers())
+    service.access_token = "second-access"
+    refreshed = await service._get_headers()
+
+    assert first is second
+    assert refreshed["Authorization"] == "Bearer second-access"
+
+
+async def test_tagged_get_responses_are_revalidated_with_etag(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "strava_access_token", "etag-access")
+    monkeypatch.setattr(settings, "strava_token_expires_at", 2_000_000_000)
+    monkeypatch.setattr(settings, "strava_token_file", str(tmp_path / "tokens.json"))
+    conditional = []
+
+    class FakeAsyncClient:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        async def request(self, **kwargs):
+            request = httpx.Request(kwargs["method"], kwargs["url"])
+            etag = kwargs["headers"].get("If-None-Match")
+            conditional.append(etag)
+            if etag == '"v1"':
+                return httpx.Response(304, request=request)
+            return httpx.Response(
+                200, json={"id": 1, "resource_state": 2}, headers={"ETag": '"v1"'}, request=request
+            )
+
+    monkeypatch.setattr(
+        "app.services.strava_service.httpx.AsyncClient", FakeAsyncClient
+    )
+    service = StravaService()
+
+    first = await service.get_athlete()
+    second = await service.get_athlete()
+
+    assert conditional == [None, '"v1"']
+    assert second.id == first.id == 1
+
+    conditional.clear()
+    await service._make_request_raw("GET", "/activities/1/streams", cache=False)
+    await service._make_request_raw("GET", "/activities/1/streams", cache=False)
+
+    assert conditional == [None, None]
+    assert len(service._etag_cache) == 1
+
+
+async def test_lookback_scans_do_not_fill_the_etag_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "strava_access_token", "etag-access")
+    monkeypatch.setattr(settings, "strava_token_expires_at", 2_000_000_000)
+    monkeypatch.setattr(settings, "strava_token_file", str(tmp_path / "tokens.json"))
+    monkeypatch.setattr(settings, "strava_no_gear_lookback_days", 180)
+    pages = []
+
+    class FakeAsyncClient:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        async def request(self, **kwargs):
+            request = httpx.Request(kwargs["method"], kwargs["url"])
+            page = kwargs["params"]["page"]
+            pages.append(page)
+            # Two full pages, then a short one ends the scan.
+            body = [] if page > 2 else [{"id": page * 1000 + i} for i in range(200)]
+            return httpx.Response(
+                200, json=body, headers={"ETag": f'"p{page}"'}, request=request
+            )
+
+    monkeypatch.setattr(
+        "app.services.strava_service.httpx.AsyncClient", FakeAsyncClient
+    )
+    monkeypatch.setattr(strava_service, "_parse_activities", lambda data: [])
+    service = StravaService()
+
+    await service.get_activities_without_gear()
+
+    assert sorted(pages) == [1, 2, 3]
+    assert len(service._etag_cache) == 0
+
+    # The undated first page is reusable and is kept; later pages are not.
+    await service._make_request_raw("GET", "/athlete/activities", params={"page": 1})
+    await service._make_request_raw("GET", "/athlete/activities", params={"page": 2})
+    assert len(service._etag_cache) == 1